@@ -7,6 +7,7 @@
 #include "esp_sleep.h"
 #include "esp_random.h"
 #include "InfluxDbClient.h"
+#include "ArduinoJson.h"
 
 #define WIFI_SSID "xxxxxxxx"
 #define WIFI_PW   "xxxxxxxx"
@@ -28,8 +29,7 @@ String COAP_URL = "ldrData2";
 #define MQTT_PASSWORD "xxxxxxxx"
 #define MQTT_TIMEOUT 10000
 
-#define SAMPLING_PERIOD_TOPIC "home/ldr2/sampling_period"
-#define POSITION_TOPIC "home/ldr2/position"
+#define CONFIG_TOPIC "home/ldr2/config"
 String LDR_num = "2";
 
 const uint8_t ldr_pin = 0;
@@ -206,7 +206,7 @@ void mqtt_reconnect() {
     if ( mqtt.connect("LDR2", MQTT_USER, MQTT_PASSWORD) ) {
       Serial.print("Connected to ");
       Serial.println(MQTT_SERVER);
-      if ( mqtt.subscribe(SAMPLING_PERIOD_TOPIC) && mqtt.subscribe(POSITION_TOPIC) ) {
+      if ( mqtt.subscribe(CONFIG_TOPIC) ) {
         Serial.println("[LOG] Subscription successful.");
       }
       else {
@@ -231,27 +231,33 @@ void mqtt_reconnect() {
 }
 
 void mqtt_callback(char *topic, byte *payload, unsigned int length) {
-  payload[length] = '\0';
-  String message = String((char *)payload);
-
-  if (String(topic) == SAMPLING_PERIOD_TOPIC) {
-    int new_sampling_period = message.toInt() * 1000;
-    if ( new_sampling_period > 1000 ) {
-      if ( new_sampling_period != sampling_period ) {
-        sampling_period = new_sampling_period;
-        Serial.print("[LOG] New sampling period detected: ");
-        Serial.print(sampling_period / 1000);
-        Serial.println("s.");
-      }
-    } else
-      Serial.println("[ERR] Sampling period must > 1s.");
-  } else if (String(topic) == POSITION_TOPIC) {
-    String new_position = message;
-    if (new_position != String(position)) {
-      strncpy(position, new_position.c_str(), sizeof(position) - 1);
-      position[sizeof(position) - 1] = '\0'; // Null-terminate
-      Serial.println("[LOG] New position detected: " + String(position));
+  if (String(topic) != CONFIG_TOPIC) return;
+
+  // Configuration payload: {"sampling_period": <s>, "position": "<name>"}
+  JsonDocument config;
+  DeserializationError error = deserializeJson(config, payload, length);
+  if ( error ) {
+    Serial.print("[ERR] Invalid configuration: ");
+    Serial.println(error.c_str());
+    return;
+  }
+
+  int new_sampling_period = config["sampling_period"].as<int>() * 1000;
+  if ( new_sampling_period > 1000 ) {
+    if ( new_sampling_period != sampling_period ) {
+      sampling_period = new_sampling_period;
+      Serial.print("[LOG] New sampling period detected: ");
+      Serial.print(sampling_period / 1000);
+      Serial.println("s.");
     }
+  } else
+    Serial.println("[ERR] Sampling period must > 1s.");
+
+  const char *new_position = config["position"] | position;
+  if (strcmp(new_position, position) != 0) {
+    strncpy(position, new_position, sizeof(position) - 1);
+    position[sizeof(position) - 1] = '\0'; // Null-terminate
+    Serial.println("[LOG] New position detected: " + String(position));
   }
 }
 
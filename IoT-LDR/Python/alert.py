@@ -16,16 +16,18 @@ limitations under the License.
 
 import asyncio
 import logging
-import json
-from time import sleep
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # The plots are only rendered to PNG, no GUI backend is needed
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime
+from datetime import datetime, timedelta
 import telegram
 from io import BytesIO
 
 from comm import DBClient, LdrSensorManager
 from sensorInfo import *
+from tools.config_cache import load_json_cached
 
 WHITE = "\033[0m"
 BLACK = "\033[30m"
@@ -42,10 +44,13 @@ ITALIC = "\033[3m"
 logger = logging.getLogger('alert unit')
 logger.setLevel(logging.INFO)
 
-last_pred_hour = -1
-last_pred_min = -1
+# Hours at which the alert check is performed
+ALERT_HOURS = tuple(range(0, 24, 4))
 
-async def load_default_config() -> dict:
+# In-memory PNG of the alert plot, reused by every alert
+plot_buffer = BytesIO()
+
+def load_default_config() -> dict:
     """
     Load the default configuration settings from a JSON file.
 
@@ -55,10 +60,9 @@ async def load_default_config() -> dict:
         Dictionary containing the default configuration settings.
     """
     logger.debug("Loading default configurations")
-    with open('default_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached('default_config.json')
 
-async def load_sensors_config() -> dict:
+def load_sensors_config() -> dict:
     """
     Load sensor-specific configuration settings from a JSON file.
 
@@ -68,8 +72,7 @@ async def load_sensors_config() -> dict:
         Dictionary containing the sensor configuration settings.
     """
     logger.debug("Loading sensors configurations")
-    with open('sensors_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached('sensors_config.json')
 
 async def setup_sensors(default_config: dict, sensors_config: dict) -> list[LdrSensorManager]:
     """
@@ -127,124 +130,174 @@ async def load_sensors():
     global ldr_sensors
     
     # Load configurations
-    default_config = await load_default_config()
-    sensors_config = await load_sensors_config()
+    default_config = load_default_config()
+    sensors_config = load_sensors_config()
     
     # Setup sensors based on the loaded configurations
     new_sensors = await setup_sensors(default_config, sensors_config)
     ldr_sensors = new_sensors
 
 
-def check_time():
-    """Check the current datetime and return whether the precise hour, quarter of hour or half of hour passed."""
-    global last_pred_hour
-    global last_pred_min
-    now = datetime.now()
-    if now.hour in [h for h in range(0, 24, 4) if h!=last_pred_hour] and now.minute in [m for m in [0, 15, 30, 45] if m!= last_pred_min]:
-        last_pred_hour = now.hour
-        last_pred_min = now.minute
-        return True
-    else:
-        return False
-    
+def next_alert_slot(after: datetime) -> datetime:
+    """
+    Compute the first alert slot strictly after the given time.
+
+    Parameters
+    ----------
+    after : datetime
+        Reference time.
+
+    Returns
+    -------
+    datetime
+        The first time, among the `ALERT_HOURS` of the day, following `after`.
+    """
+    day = after.replace(minute=0, second=0, microsecond=0)
+    for hour in ALERT_HOURS:
+        slot = day.replace(hour=hour)
+        if slot > after:
+            return slot
+    # All the slots of the day are gone, roll into the next day
+    return day.replace(hour=ALERT_HOURS[0]) + timedelta(days=1)
+
+
+# The banner is formatted once at import time
+WELCOME_BANNER = (
+    f"{BLUE}{WHITE}==================================================================={BLUE}\n"
+    "\n"
+    f"                   Welcome to {BOLD}{RED}A{YELLOW}l{LIME}e{CYAN}r{BLUE}t{MAGENTA} U{RED}n{YELLOW}i{LIME}t{WHITE}{BLUE}        \n"
+    "\n"
+    f"{ITALIC}               The script acts as alert unit.\n"
+    f"\n{WHITE}===================================================================\n{WHITE}"
+)
 
 def welcome_message() -> None:
     """
     Display a colorful welcome message for the main script.
     """
-    welcome = (
-        f"{WHITE}==================================================================={BLUE}\n"
-        "\n"
-        f"                   Welcome to {BOLD}{RED}A{YELLOW}l{LIME}e{CYAN}r{BLUE}t{MAGENTA} U{RED}n{YELLOW}i{LIME}t{WHITE}{BLUE}        \n"
-        "\n"
-        "\033[3m               The script acts as alert unit.\n"
-        f"\n{WHITE}===================================================================\n"
-    )
-    print(f"{BLUE}{welcome}{WHITE}")
+    print(WELCOME_BANNER)
 
 async def main():    
-    default_config = await load_default_config()
+    default_config = load_default_config()
     influxdb_cfg = default_config['influxdb']
     telegram_cfg = default_config['telegram']
     db_client = DBClient(influxdb_cfg['token'], influxdb_cfg['org'], influxdb_cfg['url'], influxdb_cfg['bucket'])
 
     global ldr_sensors
     await load_sensors()
-    last_current_optimal_sensor = ldr_sensors[0]
-    last_future_optimal_sensor = ldr_sensors[0]
-
-    welcome_message()
-    while True:
-        # The alert is performed any 4h
-        if check_time():
-            for ldr_sensor in ldr_sensors:
-                last_30m_df = db_client.load_timeseries('4h', ldr_sensor.sensor_id)
-                next_30m_df = db_client.load_predictions('4h', ldr_sensor.sensor_id)
-                if last_30m_df is not None and next_30m_df is not None:
-                    ldr_sensor.ldr_timeseries_avg = last_30m_df['y'].mean(skipna=True)
-                    logger.info(f"LDR{ldr_sensor.sensor_id}: {ldr_sensor.ldr_timeseries_avg: .2f}")
-                    ldr_sensor.predicted_ldr_avg = next_30m_df['y'].mean(skipna=True)
-                    logger.info(f"LDR{ldr_sensor.sensor_id} prediction: {ldr_sensor.predicted_ldr_avg: .2f}")
-            
-            optimal_pos_sensor = max(ldr_sensors, key=lambda ldr_sensor: ldr_sensor.ldr_timeseries_avg)
-            optimal_next_pos_sensor = max(ldr_sensors, key=lambda ldr_sensor: ldr_sensor.predicted_ldr_avg)
-
-            if (optimal_pos_sensor.ldr_timeseries_avg > last_current_optimal_sensor.ldr_timeseries_avg + 10) or (optimal_next_pos_sensor.predicted_ldr_avg > last_future_optimal_sensor.predicted_ldr_avg + 10):
-                message = (
-                    f"LDR{optimal_pos_sensor.sensor_id} ({optimal_pos_sensor.position.name}) has received the highest amount of light in the last 4h.\n"
-                    f"LDR{optimal_next_pos_sensor.sensor_id} ({optimal_next_pos_sensor.position.name}) should receive the highest amount of light in the next 4h."
-                )
-
-                logger.info(message)
-                last_current_optimal_sensor = optimal_pos_sensor
-                last_future_optimal_sensor = optimal_next_pos_sensor
-
-                fig, ax = plt.subplots(ncols=1, nrows=len(ldr_sensors), figsize=(10, 3 * len(ldr_sensors)), sharex=True)
-                now = datetime.now()
-
-                for ldr_sensor, subplot_ax in zip(ldr_sensors, ax):
-                    # Retrieve data for the current sensor
-                    last_30m_df = db_client.load_timeseries('4h', ldr_sensor.sensor_id)
-                    next_30m_df = db_client.load_predictions('4h', ldr_sensor.sensor_id)
-                    if last_30m_df is not None and next_30m_df is not None: 
-                        # Plot last 4h and next 4h
-                        subplot_ax.plot(last_30m_df['ds'], last_30m_df['y'], label=f"Sensed", color="#03234B", marker='o', mfc='#ffffff', mec='#03234B')
-                        subplot_ax.plot(next_30m_df['ds'], next_30m_df['y'], linestyle='--', label=f"Predicted", color="#CC2936", marker='o', mfc='#ffffff', mec='#CC2936')
-                        subplot_ax.axvline(now, color='#4EA699', linestyle='--', label=f'Now: {now.strftime("%H:%M")}')
-                        subplot_ax.set_ylim(0,100)
-                        subplot_ax.legend()
-                        
-                        # Set titles and labels for this subplot
-                        subplot_ax.set_ylabel(f"LDR{ldr_sensor.sensor_id} [%]")
-                        subplot_ax.grid(linestyle='--')
-                        subplot_ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
-                        subplot_ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-                
-                
-                ax[-1].set_xlabel("Time")
-
-                # Adjust layout to prevent overlapping
-                fig.tight_layout()
-
-                # Save the plot to an in-memory file
-                plot_file = BytesIO()
-                plt.savefig(plot_file, format='png')
-                plot_file.seek(0)
-                plt.close()
-
-
-                try:
-                    bot = telegram.Bot(token=telegram_cfg['token'])
-                    # Send the text message
-                    await asyncio.create_task(bot.send_message(chat_id=telegram_cfg['chat_id'], text=message))
-                    # Send the plot as an image
-                    await asyncio.create_task(bot.send_photo(chat_id=telegram_cfg['chat_id'], photo=plot_file))
-                except Exception as e:
-                    logger.error(f"Exception: {e}")
-                finally:
-                    plot_file.close()
-        sleep(1)
 
+    try:
+        # Averages of the sensed (current) and predicted (future) values, indexed as ldr_sensors
+        cur_avg = np.zeros(len(ldr_sensors), dtype=np.float64)
+        fut_avg = np.zeros(len(ldr_sensors), dtype=np.float64)
+        last_cur_idx = 0
+        last_fut_idx = 0
+
+        # The figure is built once and redrawn at every alert
+        fig, ax = plt.subplots(ncols=1, nrows=len(ldr_sensors), figsize=(8, 2.5 * len(ldr_sensors)), sharex=True, squeeze=False)
+        ax = ax[:, 0]
+        fig.subplots_adjust(left=0.08, right=0.98, top=0.95, bottom=0.08, hspace=0.25)
+
+        welcome_message()
+
+        # The bot keeps its HTTP session open for the whole lifetime of the unit
+        bot = telegram.Bot(token=telegram_cfg['token'])
+        async with bot:
+            slot = next_alert_slot(datetime.now())
+            while True:
+                # The alert is performed any 4h, sleep until the next slot
+                await asyncio.sleep(max((slot - datetime.now()).total_seconds(), 0))
+
+                # Query only the averages first, the whole time series are needed just for an alert
+                sensor_ids = [ldr_sensor.sensor_id for ldr_sensor in ldr_sensors]
+                last_30m_means, next_30m_means = await asyncio.gather(asyncio.to_thread(db_client.load_timeseries_mean_bulk, '4h', sensor_ids),
+                                                                      asyncio.to_thread(db_client.load_predictions_mean_bulk, '4h', sensor_ids))
+                last_30m_means = last_30m_means or {}
+                next_30m_means = next_30m_means or {}
+                get_last_30m_mean = last_30m_means.get
+                get_next_30m_mean = next_30m_means.get
+                for i, sensor_id in enumerate(sensor_ids):
+                    last_30m_mean = get_last_30m_mean(sensor_id)
+                    next_30m_mean = get_next_30m_mean(sensor_id)
+                    if last_30m_mean is not None and next_30m_mean is not None:
+                        cur_avg[i] = last_30m_mean
+                        logger.info("LDR%s: % .2f", sensor_id, last_30m_mean)
+                        fut_avg[i] = next_30m_mean
+                        logger.info("LDR%s prediction: % .2f", sensor_id, next_30m_mean)
+        
+                i_cur = int(np.argmax(cur_avg))
+                i_fut = int(np.argmax(fut_avg))
+
+                if (cur_avg[i_cur] > cur_avg[last_cur_idx] + 10) or (fut_avg[i_fut] > fut_avg[last_fut_idx] + 10):
+                    # Only the optimal sensors are needed to report the alert
+                    optimal_pos_sensor = ldr_sensors[i_cur]
+                    optimal_next_pos_sensor = ldr_sensors[i_fut]
+                    message = (
+                        f"LDR{optimal_pos_sensor.sensor_id} ({optimal_pos_sensor.position.name}) has received the highest amount of light in the last 4h.\n"
+                        f"LDR{optimal_next_pos_sensor.sensor_id} ({optimal_next_pos_sensor.position.name}) should receive the highest amount of light in the next 4h."
+                    )
+
+                    logger.info(message)
+                    last_cur_idx = i_cur
+                    last_fut_idx = i_fut
+
+                    # Query the sensed and predicted values of all the sensors with one query each
+                    last_30m_dfs, next_30m_dfs = await asyncio.gather(asyncio.to_thread(db_client.load_timeseries_bulk, '4h', sensor_ids),
+                                                                      asyncio.to_thread(db_client.load_predictions_bulk, '4h', sensor_ids))
+                    last_30m_dfs = last_30m_dfs or {}
+                    next_30m_dfs = next_30m_dfs or {}
+                    now = datetime.now()
+                    now_label = f'Now: {now.strftime("%H:%M")}'
+                    get_last_30m_df = last_30m_dfs.get
+                    get_next_30m_df = next_30m_dfs.get
+
+                    for sensor_id, subplot_ax in zip(sensor_ids, ax):
+                        # Remove the plot of the previous alert
+                        subplot_ax.clear()
+
+                        # Reuse the data retrieved for the current sensor
+                        last_30m_df = get_last_30m_df(sensor_id)
+                        next_30m_df = get_next_30m_df(sensor_id)
+                        if last_30m_df is not None and next_30m_df is not None: 
+                            # Plot last 4h and next 4h
+                            subplot_ax.plot(last_30m_df['ds'], last_30m_df['y'], label=f"Sensed", color="#03234B", marker='o', mfc='#ffffff', mec='#03234B')
+                            subplot_ax.plot(next_30m_df['ds'], next_30m_df['y'], linestyle='--', label=f"Predicted", color="#CC2936", marker='o', mfc='#ffffff', mec='#CC2936')
+                            subplot_ax.axvline(now, color='#4EA699', linestyle='--', label=now_label)
+                            subplot_ax.set_ylim(0,100)
+                            subplot_ax.legend()
+                    
+                            # Set titles and labels for this subplot
+                            subplot_ax.set_ylabel(f"LDR{sensor_id} [%]")
+                            subplot_ax.grid(linestyle='--')
+                            subplot_ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
+                            subplot_ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+            
+            
+                    ax[-1].set_xlabel("Time")
+
+                    # Save the plot to a compact in-memory PNG without blocking the event loop
+                    plot_buffer.seek(0)
+                    plot_buffer.truncate(0)
+                    await asyncio.to_thread(fig.savefig, plot_buffer, format='png', dpi=72,
+                                            pil_kwargs={'optimize': True, 'compress_level': 9})
+                    plot_buffer.seek(0)
+
+
+                    try:
+                        # Send the text message
+                        await bot.send_message(chat_id=telegram_cfg['chat_id'], text=message)
+                        # Send the plot as an image
+                        await bot.send_photo(chat_id=telegram_cfg['chat_id'], photo=plot_buffer)
+                    except Exception as e:
+                        logger.error(f"Exception: {e}")
+
+                slot = next_alert_slot(max(slot, datetime.now()))
+
+    finally:
+        # Flush the values still queued for the database
+        db_client.close()
+        for ldr_sensor in ldr_sensors:
+            ldr_sensor.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -17,6 +17,8 @@ limitations under the License.
 import argparse
 import json
 import os
+import shlex
+import sys
 
 # Color codes for terminal output
 WHITE = "\033[0m"
@@ -31,6 +33,90 @@ LIGHT_GRAY = "\033[37m"
 BOLD = "\033[1m"
 ITALIC = "\033[3m"
 
+# Messages are formatted once at import time
+HELP_MESSAGE = (
+    f"{LIME}  show {MAGENTA}[--id ID] {WHITE}                Show sensor details or all sensors if no ID is provided\n"
+    f"{LIME}  add {MAGENTA}--id ID [--port PORT] [--position NAME] [--plant TYPE] [--light AMOUNT] [--period period] [--mean-period WINDOW]\n"
+    f"                                  {WHITE}Add a new sensor with the specified details. Only --id is required.\n"
+    f"{LIME}  update {MAGENTA}--id ID [--port PORT] [--position NAME] [--plant TYPE] [--light AMOUNT] [--period period] [--mean-period WINDOW]\n"
+    f"                                  {WHITE}Update an existing sensor with the specified details. Only --id is required.\n"
+    f"{LIME}  period {MAGENTA}period                       {WHITE}Update the sampling period {YELLOW}(in seconds!){WHITE} for all existing sensors.\n"
+    f"{LIME}  window {MAGENTA}WINDOW                   {WHITE}Update the time period {YELLOW}(in minutes!){WHITE} for mean computation for all existing sensors.\n"
+    f"{LIME}  delete {MAGENTA}--id ID      {WHITE}            Delete the specified sensor.\n"
+    f"{LIME}  help                            {WHITE}Show this help message.\n"
+    f"{LIME}  exit                            {WHITE}Exit the CLI.\n"
+    f"{WHITE}"
+)
+
+WELCOME_BANNER = (
+    f"{BOLD}{BLUE}{WHITE}============================================================={BLUE}\n"
+    "\n"
+    f"               Welcome to {BOLD}{RED}S{YELLOW}e{LIME}n{CYAN}s{BLUE}o{MAGENTA}r {RED}C{YELLOW}L{LIME}I {WHITE}{BLUE}Tool{WHITE}{BLUE}        \n"
+    "\n"
+    f"{ITALIC}The CLI helps to configure and update the sensors.\n"
+    "Type 'help' to see available commands or 'exit' to quit.\n"
+    f"\n{WHITE}=============================================================\n"
+    f"{WHITE}"
+)
+
+GOODBYE_MESSAGE = f"{BLUE}\nExiting CLI. {BOLD}{RED}G{YELLOW}o{LIME}o{CYAN}d{BLUE}b{MAGENTA}y{RED}e{WHITE}!\n"
+
+# Sensor details, filled with str.format_map
+SENSOR_TEMPLATE = (
+    f"{BOLD}{CYAN}Sensor ID: {WHITE}{{id}}{WHITE}\n"
+    f"{BOLD}{CYAN}Position Name: {WHITE}{{position_name}}{WHITE}\n"
+    f"{BOLD}{CYAN}Position Description: {WHITE}{{position_description}}{WHITE}\n"
+    f"{BOLD}{CYAN}Plant Type: {WHITE}{{plant_type}}{WHITE}\n"
+    f"{BOLD}{CYAN}Plant Light Amount: {WHITE}{{light_amount}}H{WHITE}\n"
+    f"{BOLD}{CYAN}Sampling Period: {WHITE}{{sampling_period}}s{WHITE}\n"
+    f"{BOLD}{BLACK}COAP Port: {WHITE}{BLACK}{{coap_port}}{WHITE}\n"
+    "=============\n"
+)
+
+# Parsed JSON files along with the modification time they were parsed at.
+# The CLI keeps its own cache instead of tools.load_json_cached: the loaded dictionaries
+# are edited in place before being saved, and dump_json stores them back in this cache
+json_cache: dict[str, tuple[int, dict]] = {}
+
+def cached_json(config_file: str) -> dict:
+    """
+    Load a JSON file, parsing it again only when its modification time changes.
+
+    Parameters
+    ---------
+    **config_file**: str
+        Path of the JSON file.
+    """
+    mtime = os.stat(config_file).st_mtime_ns
+    cached = json_cache.get(config_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(config_file, 'r') as file:
+        config = json.load(file)
+    json_cache[config_file] = (mtime, config)
+    return config
+
+def dump_json(config: dict, config_file: str) -> None:
+    """
+    Atomically write a JSON file and keep the cached copy in sync with it.
+
+    The content is written to a temporary file which then replaces the original one,
+    so that a crash never leaves a partially written configuration.
+
+    Parameters
+    ---------
+    **config**: dict
+        Configuration dictionary.
+    **config_file**: str
+        Path of the JSON file.
+    """
+    tmp_file = f"{config_file}.tmp"
+    with open(tmp_file, 'w') as file:
+        json.dump(config, file, indent=4)
+    os.replace(tmp_file, config_file)
+    json_cache[config_file] = (os.stat(config_file).st_mtime_ns, config)
+
 def load_default_config() -> dict:
     """Load default configurations from JSON."""
     config_file = 'default_config.json'
@@ -38,8 +124,7 @@ def load_default_config() -> dict:
         print(f"Default configuration file '{config_file}' not found.")
         return {}
     
-    with open(config_file, 'r') as file:
-        return json.load(file)
+    return cached_json(config_file)
 
 def load_sensor_config() -> dict:
     """Load sensor configurations from JSON."""
@@ -48,8 +133,7 @@ def load_sensor_config() -> dict:
         print(f"Sensor configuration file '{config_file}' not found.")
         return {}
     
-    with open(config_file, 'r') as file:
-        return json.load(file)
+    return cached_json(config_file)
 
 def save_sensor_config(config: dict) -> None:
     """
@@ -60,9 +144,7 @@ def save_sensor_config(config: dict) -> None:
     **config**: dict 
         Configuration dictionary.
     """
-    config_file = 'sensors_config.json'
-    with open(config_file, 'w') as file:
-        json.dump(config, file, indent=4)
+    dump_json(config, 'sensors_config.json')
 
 def load_position_config() -> dict:
     """Load position configurations from JSON."""
@@ -71,36 +153,43 @@ def load_position_config() -> dict:
         print(f"Position configuration file '{config_file}' not found.")
         return {}
     
-    with open(config_file, 'r') as file:
-        return json.load(file)
+    return cached_json(config_file)
 
 def save_position_config(config: dict) -> None:
     """Save position configurations to JSON."""
-    config_file = 'positions.json'
-    with open(config_file, 'w') as file:
-        json.dump(config, file, indent=4)
+    dump_json(config, 'positions.json')
+
+def index_by(items: list[dict], key: str = 'id') -> dict:
+    """
+    Index a list of configuration entries by one of their fields.
+    
+    Parameters
+    ---------
+    **items**: list[dict]
+        Configuration entries (e.g., sensors, positions).
+    **key**: str
+        Field used as index.
+    """
+    return {item.get(key): item for item in items}
 
 def get_or_create_position(position_name: str) -> dict:
     """Get a position by name or create a new one if it doesn't exist."""
     config = load_position_config()
     positions = config.get("positions", [])
+    positions_by_name = index_by(positions, 'name')
 
     # Check if the position already exists
-    position = next((p for p in positions if p.get('name') == position_name), None)
+    position = positions_by_name.get(position_name)
     
     if position:
         print(f"Using existing position: {position_name}")
     else:
         print(f"Position '{position_name}' not found. Creating new position.")
         
-        # Determine the highest position_id in the current list of positions
-        if positions:
-            max_position_id = max(int(p.get('position_id', 0)) for p in positions)
-        else:
-            max_position_id = 0
-
-        # Generate a new position ID
-        new_position_id = max_position_id + 1
+        # Generate a new position ID, the next free one is kept in the configuration file
+        new_position_id = config.get('next_position_id')
+        if new_position_id is None:
+            new_position_id = max((int(p.get('position_id', 0)) for p in positions), default=0) + 1
         
         description = input(f"{YELLOW}\nEnter position description: {WHITE}")
         position = {
@@ -110,27 +199,42 @@ def get_or_create_position(position_name: str) -> dict:
         }
         positions.append(position)
         config['positions'] = positions
+        config['next_position_id'] = new_position_id + 1
         save_position_config(config)
         print(f"Created new position: {position_name} with ID {new_position_id}")
     
     return position
 
+def print_sensor(sensor: dict) -> None:
+    """
+    Print the details of a sensor.
+    
+    Parameters
+    ---------
+    **sensor**: dict
+        Sensor configuration.
+    """
+    position = sensor.get('position') or {}
+    plant = sensor.get('plant') or {}
+    sys.stdout.write(SENSOR_TEMPLATE.format_map({
+        'id': sensor.get('id'),
+        'position_name': position.get('name'),
+        'position_description': position.get('description'),
+        'plant_type': plant.get('type'),
+        'light_amount': plant.get('light_amount'),
+        'sampling_period': sensor.get('sampling_period'),
+        'coap_port': sensor.get('coap_port'),
+    }))
+
 def show_sensor(args) -> None:
     """Show sensor information."""
     config = load_sensor_config()
     sensors = config.get("sensors", [])
 
     if args.id:
-        sensor = next((s for s in sensors if s.get("id") == args.id), None)
+        sensor = index_by(sensors).get(args.id)
         if sensor:
-            print(f"{BOLD}{CYAN}Sensor ID: {WHITE}{sensor.get('id')}{WHITE}")
-            print(f"{BOLD}{CYAN}Position Name: {WHITE}{sensor.get('position', {}).get('name')}{WHITE}")
-            print(f"{BOLD}{CYAN}Position Description: {WHITE}{sensor.get('position', {}).get('description')}{WHITE}")
-            print(f"{BOLD}{CYAN}Plant Type: {WHITE}{sensor.get('plant', {}).get('type')}{WHITE}")
-            print(f"{BOLD}{CYAN}Plant Light Amount: {WHITE}{sensor.get('plant', {}).get('light_amount')}H{WHITE}")
-            print(f"{BOLD}{CYAN}Sampling period: {WHITE}{sensor.get('sampling_period')}s{WHITE}")
-            print(f"{BOLD}{BLACK}COAP Port: {WHITE}{BLACK}{sensor.get('coap_port')}{WHITE}")
-            print(f"=============")
+            print_sensor(sensor)
         else:
             print(f"{BOLD}{RED}No sensor found with ID {args.id}{WHITE}")
     else:
@@ -138,14 +242,7 @@ def show_sensor(args) -> None:
             print(f"{BOLD}{RED}No sensors found.{WHITE}")
             return
         for sensor in sensors:
-            print(f"{BOLD}{CYAN}Sensor ID: {WHITE}{sensor.get('id')}{WHITE}")
-            print(f"{BOLD}{CYAN}Position Name: {WHITE}{sensor.get('position', {}).get('name')}{WHITE}")
-            print(f"{BOLD}{CYAN}Position Description: {WHITE}{sensor.get('position', {}).get('description')}{WHITE}")
-            print(f"{BOLD}{CYAN}Plant Type: {WHITE}{sensor.get('plant', {}).get('type')}{WHITE}")
-            print(f"{BOLD}{CYAN}Plant Light Amount: {WHITE}{sensor.get('plant', {}).get('light_amount')}H{WHITE}")
-            print(f"{BOLD}{CYAN}Sampling Period: {WHITE}{sensor.get('sampling_period')}s{WHITE}")
-            print(f"{BOLD}{BLACK}COAP Port: {WHITE}{BLACK}{sensor.get('coap_port')}{WHITE}")
-            print(f"=============")
+            print_sensor(sensor)
 
 def add_sensor(args) -> None:
     """Add sensor to configuration."""
@@ -178,7 +275,7 @@ def update_sensor(args) -> None:
     config = load_sensor_config()
     sensors = config.get("sensors", [])
     
-    sensor = next((s for s in sensors if s.get('id') == args.id), None)
+    sensor = index_by(sensors).get(args.id)
     if sensor:
         if args.port is not None:
             sensor['coap_port'] = args.port
@@ -211,10 +308,14 @@ def update_all_sampling_periods(args) -> None:
 
     sampling_period = args.sampling_period
     if sampling_period is not None:
+        changed = False
         for sensor in sensors:
-            sensor['sampling_period'] = sampling_period
+            if sensor.get('sampling_period') != sampling_period:
+                sensor['sampling_period'] = sampling_period
+                changed = True
         
-        save_sensor_config(config)
+        if changed:
+            save_sensor_config(config)
         
         print(f"Updated sampling period for all sensors to {sampling_period}")
     else:
@@ -231,10 +332,14 @@ def update_all_accumulation_windows(args) -> None:
 
     accumulation_window = args.accumulation_window
     if accumulation_window is not None:
+        changed = False
         for sensor in sensors:
-            sensor['accumulation_window'] = accumulation_window
+            if sensor.get('accumulation_window') != accumulation_window:
+                sensor['accumulation_window'] = accumulation_window
+                changed = True
         
-        save_sensor_config(config)
+        if changed:
+            save_sensor_config(config)
         
         print(f"Updated accumulation window for all sensors to {accumulation_window} seconds")
     else:
@@ -247,7 +352,7 @@ def delete_sensor(args) -> None:
 
     if args.id:
         # Delete sensor by ID
-        sensor = next((s for s in sensors if s.get('id') == args.id), None)
+        sensor = index_by(sensors).get(args.id)
         if sensor:
             sensors.remove(sensor)
             config['sensors'] = sensors
@@ -261,33 +366,11 @@ def delete_sensor(args) -> None:
 
 def show_help() -> None:
     """Show help message."""
-    help_message = (
-        f"{LIME}  show {MAGENTA}[--id ID] {WHITE}                Show sensor details or all sensors if no ID is provided\n"
-        f"{LIME}  add {MAGENTA}--id ID [--port PORT] [--position NAME] [--plant TYPE] [--light AMOUNT] [--period period] [--mean-period WINDOW]\n"
-        f"                                  {WHITE}Add a new sensor with the specified details. Only --id is required.\n"
-        f"{LIME}  update {MAGENTA}--id ID [--port PORT] [--position NAME] [--plant TYPE] [--light AMOUNT] [--period period] [--mean-period WINDOW]\n"
-        f"                                  {WHITE}Update an existing sensor with the specified details. Only --id is required.\n"
-        f"{LIME}  period {MAGENTA}period                       {WHITE}Update the sampling period {YELLOW}(in seconds!){WHITE} for all existing sensors.\n"
-        f"{LIME}  window {MAGENTA}WINDOW                   {WHITE}Update the time period {YELLOW}(in minutes!){WHITE} for mean computation for all existing sensors.\n"
-        f"{LIME}  delete {MAGENTA}--id ID      {WHITE}            Delete the specified sensor.\n"
-        f"{LIME}  help                            {WHITE}Show this help message.\n"
-        f"{LIME}  exit                            {WHITE}Exit the CLI.\n"
-    )
-    print(f"{help_message}{WHITE}")
+    print(HELP_MESSAGE)
 
 def welcome_interface() -> None:
     """Show welcome message."""
-    welcome_message = (
-        f"{WHITE}============================================================={BLUE}\n"
-        "\n"
-        f"               Welcome to {BOLD}{RED}S{YELLOW}e{LIME}n{CYAN}s{BLUE}o{MAGENTA}r {RED}C{YELLOW}L{LIME}I {WHITE}{BLUE}Tool{WHITE}{BLUE}        \n"
-        "\n"
-        f"{ITALIC}The CLI helps to configure and update the sensors.\n"
-        "Type 'help' to see available commands or 'exit' to quit.\n"
-        f"\n{WHITE}=============================================================\n"
-    )
-    
-    print(f"{BOLD}{BLUE}{welcome_message}{WHITE}")
+    print(WELCOME_BANNER)
 
 def main():
     welcome_interface()
@@ -336,23 +419,35 @@ def main():
     parser_delete.add_argument('--id', type=str, help='Sensor ID to delete')
     parser_delete.set_defaults(func=delete_sensor)
 
-    # Custom help command
-    parser.add_argument("command", choices=["help", "exit"], nargs="?")
+    # Dispatch table from the command verb to its parser and handler
+    commands = {
+        "show": (show_parser, show_sensor),
+        "add": (add_parser, add_sensor),
+        "update": (update_parser, update_sensor),
+        "period": (update_all_parser, update_all_sampling_periods),
+        "window": (update_window_parser, update_all_accumulation_windows),
+        "delete": (parser_delete, delete_sensor),
+    }
     
     while True:
         user_input = input(f"{YELLOW}\n> {WHITE}")
-        if user_input == "exit":
-            print(f"{BLUE}\nExiting CLI. {BOLD}{RED}G{YELLOW}o{LIME}o{CYAN}d{BLUE}b{MAGENTA}y{RED}e{WHITE}!\n")
+        try:
+            # Split as a shell would, so that quoted values may contain spaces
+            tokens = shlex.split(user_input)
+        except ValueError as e:
+            print(f"{BOLD}{RED}Invalid input: {e}{WHITE}")
+            continue
+
+        verb = tokens[0] if tokens else "help"
+        if verb == "exit":
+            print(GOODBYE_MESSAGE)
             break
-        elif user_input == "help":
+        elif verb == "help" or verb not in commands:
             show_help()
         else:
+            command_parser, handler = commands[verb]
             try:
-                args = parser.parse_args(user_input.split())
-                if hasattr(args, 'func'):
-                    args.func(args)
-                else:
-                    show_help()
+                handler(command_parser.parse_args(tokens[1:]))
             except SystemExit:
                 pass
 
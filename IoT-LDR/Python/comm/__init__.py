@@ -17,7 +17,7 @@ limitations under the License.
 from .ldr_sensor_manager import LdrSensorManager
 from .mqtt_client import MqttClient
 from .db_client import DBClient
-from .processing import model_predict, generate_holidays, preprocess_timeseries
+from .processing import forecast, generate_holidays, preprocess_timeseries
 
 __all__ = ['LdrSensorManager', 'MqttClient', 'DBClient',
-           'model_predict', 'generate_holidays', 'preprocess_timeseries']
\ No newline at end of file
+           'forecast', 'generate_holidays', 'preprocess_timeseries']
\ No newline at end of file
@@ -17,12 +17,11 @@ limitations under the License.
 import logging
 import time
 import asyncio
-from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 import numpy as np
 import pandas as pd
-from influxdb_client import InfluxDBClient, Point, WritePrecision
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client import InfluxDBClient, WritePrecision
+from influxdb_client.client.write_api import WriteOptions
 
 class DBClient:
     """
@@ -31,11 +30,15 @@ class DBClient:
 
     Attributes
     ----------
-    tz : pytz.timezone
+    tz : zoneinfo.ZoneInfo
         Timezone for data storage and retrieval, set to "Europe/Rome".
+    cache_ttl : float
+        Seconds for which a loaded time series is reused before querying the database again.
 
     Methods
     -------
+    close()
+        Flush the pending points and close the connection to the InfluxDB instance.
     store_value(measurement, field, sensor_id, value)
         Store a single value in the InfluxDB database.
     store_ldr_influxdb(ldr_value, sensor_id)
@@ -44,11 +47,28 @@ class DBClient:
         Store mean latency values in the database.
     load_timeseries(time_window, sensor_id)
         Retrieve a time series of sensor data from the database.
-    store_predictions(predictions_df, sensor_id)
+    load_timeseries_bulk(time_window, sensor_ids)
+        Retrieve the time series of several sensors with a single query.
+    store_predictions(predictions_df, sensor_id, fields)
         Store predicted values in the database.
+    store_predictions_all(predictions_df, sensor_id)
+        Store predicted values and their bounds in the database with a single write.
+    load_predictions_bulk(time_window, sensor_ids)
+        Retrieve the predictions of several sensors with a single query.
+    load_timeseries_mean_bulk(time_window, sensor_ids)
+        Retrieve the mean sensed value of several sensors with a single query.
+    load_predictions_mean_bulk(time_window, sensor_ids)
+        Retrieve the mean predicted value of several sensors with a single query.
     """
     
-    tz = pytz.timezone("Europe/Rome")
+    tz = ZoneInfo("Europe/Rome")
+
+    # Characters to be escaped in the tag values of the line protocol
+    tag_escape = str.maketrans({',': '\\,', '=': '\\=', ' ': '\\ '})
+
+    # Kept below the minimum sampling period of the nodes, so a cached time series
+    # misses at most the last sample
+    cache_ttl = 1.0
 
     def __init__(self, db_token: str, db_org: str, db_url: str, db_bucket: str):
         """
@@ -76,6 +96,118 @@ class DBClient:
             "bucket": db_bucket
         }
 
+        # A single client is kept for the whole lifetime of the object, so that its
+        # HTTP connection pool is reused across writes and queries. Line protocol and
+        # Flux CSV compress well, so both directions are gzipped
+        self.client = InfluxDBClient(url=db_url, token=db_token, org=db_org, enable_gzip=True, timeout=10_000)
+
+        # Points are queued and written in batches by a background thread
+        self.write_api = self.client.write_api(write_options=WriteOptions(batch_size=100,
+                                                                          flush_interval=1000,
+                                                                          jitter_interval=200,
+                                                                          retry_interval=5000),
+                                               error_callback=self.on_write_error)
+        self.query_api = self.client.query_api()
+
+        # Loaded time series along with the time they expire at, keyed by (kind, sensor, window)
+        self.query_cache: dict[tuple[str, str, str], tuple[float, pd.DataFrame]] = {}
+
+        # Sensor IDs escaped for the line protocol, so that each ID is escaped only once
+        self.escaped_ids: dict[str, str] = {}
+
+    def on_write_error(self, conf: tuple[str, str, str], data: str, exception: Exception) -> None:
+        """
+        Log a batch that could not be written to the database.
+
+        Parameters
+        ----------
+        conf : tuple[str, str, str]
+            Bucket, organization and precision of the batch.
+        data : str
+            The batch in line protocol.
+        exception : Exception
+            The error raised while writing the batch.
+        """
+        self.logger.error(f"Exception: {exception}")
+
+    def close(self) -> None:
+        """
+        Flush the pending points and close the connection to the InfluxDB instance.
+        """
+        self.write_api.close()
+        self.client.close()
+
+    def _load_cached(self, kind: str, time_window: str, sensor_id: str, loader) -> pd.DataFrame:
+        """
+        Return the cached result of a time series load, running `loader` when it is missing or expired.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of time series (e.g., 'timeseries', 'predictions').
+        time_window : str
+            The time range of the time series.
+        sensor_id : str
+            Identifier for the sensor.
+        loader : Callable[[str, str], pd.DataFrame]
+            Function loading the time series from the database.
+
+        Returns
+        -------
+        pd.DataFrame
+            A copy of the loaded time series, or None if the load failed.
+        """
+        key = (kind, sensor_id, time_window)
+        now = time.monotonic()
+        cached = self.query_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1].copy()
+
+        df = loader(time_window, sensor_id)
+        if df is None:
+            return None
+        self.query_cache[key] = (now + self.cache_ttl, df)
+        return df.copy()
+
+    def _sensor_tag(self, sensor_id: str) -> str:
+        """
+        Return the `sensor` tag of the line protocol for a given sensor.
+
+        Parameters
+        ----------
+        sensor_id : str
+            Identifier for the sensor.
+
+        Returns
+        -------
+        str
+            The escaped tag (e.g., 'sensor=1').
+        """
+        tag = self.escaped_ids.get(sensor_id)
+        if tag is None:
+            tag = "sensor=" + str(sensor_id).translate(self.tag_escape)
+            self.escaped_ids[sensor_id] = tag
+        return tag
+
+    def _write_line(self, measurement: str, field: str, sensor_id: str, value: float) -> None:
+        """
+        Queue a single value for writing, formatted directly as line protocol and
+        timestamped in nanoseconds since the epoch.
+
+        Parameters
+        ----------
+        measurement : str
+            Name of the measurement.
+        field : str
+            Field name under which the value is stored.
+        sensor_id : str
+            Identifier for the sensor.
+        value : float
+            The value to store.
+        """
+        record = f"{measurement},{self._sensor_tag(sensor_id)} {field}={float(value)} {time.time_ns()}"
+        self.write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=record, write_precision=WritePrecision.NS)
+
     def store_value(self, measurement: str, field: str, sensor_id: str, value: float) -> None:
         """
         Store a single measurement value in the InfluxDB database.
@@ -92,17 +224,10 @@ class DBClient:
             The value to store.
         """
         try:
-            self.logger.debug(f"Storing value from {sensor_id} in {measurement}: {value}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
+            self.logger.debug("Storing value from %s in %s: %s", sensor_id, measurement, value)
 
-            # Create a point with the given data
-            p = Point(measurement).tag("sensor", sensor_id).field(field, float(value)).time(datetime.now(tz=self.tz), WritePrecision.S)
-            self.logger.debug(f"Point: {p}")
-            
             # Write the point to the database
-            write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            client.close()
+            self._write_line(measurement, field, sensor_id, value)
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
@@ -118,14 +243,10 @@ class DBClient:
             Identifier for the sensor.
         """
         try:
-            self.logger.debug(f"Storing values sensed from LDR{sensor_id}: {ldr_value}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
+            self.logger.debug("Storing values sensed from LDR%s: %s", sensor_id, ldr_value)
 
             # Store LDR value as a "ldrValue" measurement
-            p = Point("ldrValue").tag("sensor", sensor_id).field("ldr", float(ldr_value)).time(datetime.now(tz=self.tz), WritePrecision.S)
-            write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            client.close()
+            self._write_line("ldrValue", "ldr", sensor_id, ldr_value)
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
@@ -141,14 +262,10 @@ class DBClient:
             Identifier for the sensor.
         """
         try:
-            self.logger.debug(f"Storing mean latency for LDR{sensor_id}: {mean_lat}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
+            self.logger.debug("Storing mean latency for LDR%s: %s", sensor_id, mean_lat)
 
             # Store the mean latency value as a "meanLat" measurement
-            p = Point("meanLat").tag("sensor", sensor_id).field("mean_lat", float(mean_lat)).time(datetime.now(tz=self.tz), WritePrecision.S)
-            write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            client.close()
+            self._write_line("meanLat", "mean_lat", sensor_id, mean_lat)
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
@@ -156,6 +273,8 @@ class DBClient:
         """
         Load a time series of the last `time_window` samples for a given sensor.
 
+        The result is cached for `cache_ttl` seconds.
+
         Parameters
         ----------
         time_window : str
@@ -169,9 +288,26 @@ class DBClient:
             A DataFrame containing the time series data with columns `ds` (timestamps)
             and `y` (values). If insufficient data is available, returns an empty DataFrame.
         """
-        try:
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
+        return self._load_cached('timeseries', time_window, sensor_id, self._load_timeseries)
+
+    def _load_timeseries(self, time_window: str, sensor_id: str) -> pd.DataFrame:
+        """
+        Query the time series of the last `time_window` samples for a given sensor.
 
+        Parameters
+        ----------
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_id : str
+            Identifier for the sensor.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the time series data with columns `ds` (timestamps)
+            and `y` (values). If insufficient data is available, returns an empty DataFrame.
+        """
+        try:
             # Query InfluxDB for the specified time window and sensor
             query = f'''
                 from(bucket: "{self.db_cfg['bucket']}")
@@ -181,19 +317,10 @@ class DBClient:
                         r._field == "ldr" and
                         r.sensor == "{sensor_id}"
                     )
+                    |> keep(columns: ["_time", "_value", "sensor"])
+                    |> map(fn: (r) => ({{ r with _time: uint(v: r._time) }}))
                 '''
-            query_api = client.query_api()
-            result = query_api.query(query)
-
-            # Parse results into a DataFrame
-            data = {'ds': [], 'y': []}
-            for table in result:
-                for record in table.records:
-                    data['ds'].append(record.get_time())
-                    data['y'].append(record.get_value())
-
-            df = pd.DataFrame(data)
-            df['ds'] = pd.to_datetime(df['ds']).dt.tz_convert('Europe/Rome').dt.tz_localize(None)
+            df = self._query_timeseries(query)[['ds', 'y']]
 
             # Validate if data is sufficient
             if df.dropna().shape[0] < 2:
@@ -201,41 +328,49 @@ class DBClient:
             else:
                 self.logger.debug("Sufficient data found. Proceeding to analysis")
             
-            client.close()
             return df
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
-    def store_predictions(self, predictions_df: pd.DataFrame, sensor_id: str) -> None:
+    def load_timeseries_bulk(self, time_window: str, sensor_ids: list[str]) -> dict[str, pd.DataFrame]:
         """
-        Store predicted values in the InfluxDB database.
+        Load the time series of the last `time_window` samples for several sensors with a single query.
 
         Parameters
         ----------
-        predictions_df : pd.DataFrame
-            DataFrame containing predicted values with columns `ds` (timestamps)
-            and `yhat` (predicted values).
-        sensor_id : str
-            Identifier for the sensor.
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            A DataFrame for each sensor ID with columns `ds` (timestamps) and `y` (values).
+            If insufficient data is available for a sensor, its DataFrame is empty.
         """
         try:
-            self.logger.debug(f"Storing predicted values for LDR{sensor_id}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-
-            # Write predictions row by row to the database
-            for _, row in predictions_df.iterrows():
-                timestamp = pd.to_datetime(row['ds']).tz_localize('Europe/Rome')
-                p = Point("ldrValue").tag("sensor", sensor_id).field("pred", float(row['yhat'])).time(timestamp, WritePrecision.S)
-                write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            
-            client.close()
+            # Query InfluxDB for the specified time window and all the sensors at once
+            query = f'''
+                from(bucket: "{self.db_cfg['bucket']}")
+                    |> range(start: -{time_window}, stop: now())
+                    |> filter(fn: (r) =>
+                        r._measurement == "ldrValue" and
+                        r._field == "ldr" and
+                        contains(value: r.sensor, set: {self._flux_set(sensor_ids)})
+                    )
+                    |> keep(columns: ["_time", "_value", "sensor"])
+                    |> map(fn: (r) => ({{ r with _time: uint(v: r._time) }}))
+                '''
+            df = self._query_timeseries(query)
+
+            return self._split_by_sensor(df, sensor_ids)
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
-    def store_predictions_upper(self, predictions_df: pd.DataFrame, sensor_id: str) -> None:
+    def store_predictions(self, predictions_df: pd.DataFrame, sensor_id: str, fields: dict[str, str] | None = None) -> None:
         """
-        Store predicted values in the InfluxDB database.
+        Store predicted values in the InfluxDB database with a single write.
 
         Parameters
         ----------
@@ -244,53 +379,86 @@ class DBClient:
             and `yhat` (predicted values).
         sensor_id : str
             Identifier for the sensor.
+        fields : dict[str, str], optional
+            Field name under which each column of `predictions_df` is stored,
+            by default `yhat` is stored as `pred`.
         """
         try:
-            self.logger.debug(f"Storing predicted values for LDR{sensor_id}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-
-            # Write predictions row by row to the database
-            for _, row in predictions_df.iterrows():
-                timestamp = pd.to_datetime(row['ds']).tz_localize('Europe/Rome')
-                p = Point("ldrValue").tag("sensor", sensor_id).field("pred_upper", float(row['yhat_upper'])).time(timestamp, WritePrecision.S)
-                write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            
-            client.close()
+            self.logger.debug("Storing predicted values for LDR%s", sensor_id)
+
+            # Write all the predictions to the database at once
+            self._store_prediction_fields(predictions_df, sensor_id, fields or {'yhat': 'pred'})
         except Exception as e:
             self.logger.error(f"Exception: {e}")
 
+    def store_predictions_upper(self, predictions_df: pd.DataFrame, sensor_id: str) -> None:
+        """
+        Store the upper bound (`yhat_upper`) of the predicted values in the InfluxDB database.
+        """
+        self.store_predictions(predictions_df, sensor_id, {'yhat_upper': 'pred_upper'})
+
     def store_predictions_lower(self, predictions_df: pd.DataFrame, sensor_id: str) -> None:
         """
-        Store predicted values in the InfluxDB database.
+        Store the lower bound (`yhat_lower`) of the predicted values in the InfluxDB database.
+        """
+        self.store_predictions(predictions_df, sensor_id, {'yhat_lower': 'pred_lower'})
+
+    def store_predictions_all(self, predictions_df: pd.DataFrame, sensor_id: str) -> None:
+        """
+        Store predicted values along with their upper and lower bounds as the fields
+        of the same points in the InfluxDB database.
+        """
+        self.store_predictions(predictions_df, sensor_id, {'yhat': 'pred',
+                                                            'yhat_upper': 'pred_upper',
+                                                            'yhat_lower': 'pred_lower'})
+
+    def _store_prediction_fields(self, predictions_df: pd.DataFrame, sensor_id: str, fields: dict[str, str]) -> None:
+        """
+        Store columns of predicted values with a single write, building the line protocol
+        for all the rows at once.
 
         Parameters
         ----------
         predictions_df : pd.DataFrame
-            DataFrame containing predicted values with columns `ds` (timestamps)
-            and `yhat` (predicted values).
+            DataFrame containing predicted values with column `ds` (timestamps).
         sensor_id : str
             Identifier for the sensor.
+        fields : dict[str, str]
+            Field name under which each column of `predictions_df` is stored.
         """
-        try:
-            self.logger.debug(f"Storing predicted values for LDR{sensor_id}")
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-
-            # Write predictions row by row to the database
-            for _, row in predictions_df.iterrows():
-                timestamp = pd.to_datetime(row['ds']).tz_localize('Europe/Rome')
-                p = Point("ldrValue").tag("sensor", sensor_id).field("pred_lower", float(row['yhat_lower'])).time(timestamp, WritePrecision.S)
-                write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=p)
-            
-            client.close()
-        except Exception as e:
-            self.logger.error(f"Exception: {e}")
+        # The predicted timestamps are aligned to the minute, so second precision loses nothing
+        timestamps = self._to_unix_ns(predictions_df['ds']) // 1_000_000_000
+        field_set = None
+        for column, field in fields.items():
+            values = f"{field}=" + predictions_df[column].astype(np.float64).astype(str)
+            field_set = values if field_set is None else field_set + "," + values
+        lines = ("ldrValue," + self._sensor_tag(sensor_id) + " " + field_set + " " + timestamps.astype(str)).tolist()
+        self.write_api.write(bucket=self.db_cfg['bucket'], org=self.db_cfg['org'], record=lines, write_precision=WritePrecision.S)
+
+    @staticmethod
+    def _to_unix_ns(timestamps: pd.Series) -> pd.Series:
+        """
+        Convert naive local (Europe/Rome) timestamps to nanoseconds since the Unix epoch.
+
+        Parameters
+        ----------
+        timestamps : pd.Series
+            Naive timestamps expressed in the Europe/Rome timezone.
+
+        Returns
+        -------
+        pd.Series
+            The timestamps as int64 nanoseconds since the Unix epoch.
+        """
+        utc = pd.to_datetime(timestamps).dt.tz_localize('Europe/Rome').dt.tz_convert('UTC').dt.tz_localize(None)
+        return pd.Series(utc.to_numpy(dtype='datetime64[ns]').astype(np.int64), index=timestamps.index)
 
     def load_predictions(self, time_window: str, sensor_id: str) -> pd.DataFrame:
         """
         Load a time series of the next `time_window` predicted samples for a given sensor.
 
+        The result is cached for `cache_ttl` seconds.
+
         Parameters
         ----------
         time_window : str
@@ -304,9 +472,26 @@ class DBClient:
             A DataFrame containing the time series data with columns `ds` (timestamps)
             and `y` (values). If insufficient data is available, returns an empty DataFrame.
         """
-        try:
-            client = InfluxDBClient(url=self.db_cfg['url'], token=self.db_cfg['token'], org=self.db_cfg['org'])
+        return self._load_cached('predictions', time_window, sensor_id, self._load_predictions)
+
+    def _load_predictions(self, time_window: str, sensor_id: str) -> pd.DataFrame:
+        """
+        Query the time series of the next `time_window` predicted samples for a given sensor.
 
+        Parameters
+        ----------
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_id : str
+            Identifier for the sensor.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the time series data with columns `ds` (timestamps)
+            and `y` (values). If insufficient data is available, returns an empty DataFrame.
+        """
+        try:
             # Query InfluxDB for the specified time window and sensor
             query = f'''
                 import "experimental"
@@ -317,19 +502,10 @@ class DBClient:
                         r._field == "pred" and
                         r.sensor == "{sensor_id}"
                     )
+                    |> keep(columns: ["_time", "_value", "sensor"])
+                    |> map(fn: (r) => ({{ r with _time: uint(v: r._time) }}))
                 '''
-            query_api = client.query_api()
-            result = query_api.query(query)
-
-            # Parse results into a DataFrame
-            data = {'ds': [], 'y': []}
-            for table in result:
-                for record in table.records:
-                    data['ds'].append(record.get_time())
-                    data['y'].append(record.get_value())
-
-            df = pd.DataFrame(data)
-            df['ds'] = pd.to_datetime(df['ds']).dt.tz_convert('Europe/Rome').dt.tz_localize(None)
+            df = self._query_timeseries(query)[['ds', 'y']]
 
             # Validate if data is sufficient
             if df.dropna().shape[0] < 2:
@@ -337,7 +513,215 @@ class DBClient:
             else:
                 self.logger.debug("Sufficient data found. Proceeding to analysis")
             
-            client.close()
             return df
         except Exception as e:
-            self.logger.error(f"Exception: {e}")
\ No newline at end of file
+            self.logger.error(f"Exception: {e}")
+
+    def load_predictions_bulk(self, time_window: str, sensor_ids: list[str]) -> dict[str, pd.DataFrame]:
+        """
+        Load the next `time_window` predicted samples for several sensors with a single query.
+
+        Parameters
+        ----------
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            A DataFrame for each sensor ID with columns `ds` (timestamps) and `y` (values).
+            If insufficient data is available for a sensor, its DataFrame is empty.
+        """
+        try:
+            # Query InfluxDB for the specified time window and all the sensors at once
+            query = f'''
+                import "experimental"
+                from(bucket: "{self.db_cfg['bucket']}")
+                    |> range(start: now(), stop: experimental.addDuration(d: {time_window}, to: now()))
+                    |> filter(fn: (r) =>
+                        r._measurement == "ldrValue" and
+                        r._field == "pred" and
+                        contains(value: r.sensor, set: {self._flux_set(sensor_ids)})
+                    )
+                    |> keep(columns: ["_time", "_value", "sensor"])
+                    |> map(fn: (r) => ({{ r with _time: uint(v: r._time) }}))
+                '''
+            df = self._query_timeseries(query)
+
+            return self._split_by_sensor(df, sensor_ids)
+        except Exception as e:
+            self.logger.error(f"Exception: {e}")
+
+    def load_timeseries_mean_bulk(self, time_window: str, sensor_ids: list[str]) -> dict[str, float]:
+        """
+        Load the mean of the last `time_window` samples for several sensors with a single query.
+
+        The mean is computed by InfluxDB, so only one value per sensor is transferred.
+
+        Parameters
+        ----------
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        dict[str, float]
+            The mean value for each sensor ID. Sensors without data are missing.
+        """
+        try:
+            # Query InfluxDB for the mean over the specified time window of all the sensors at once
+            query = f'''
+                from(bucket: "{self.db_cfg['bucket']}")
+                    |> range(start: -{time_window}, stop: now())
+                    |> filter(fn: (r) =>
+                        r._measurement == "ldrValue" and
+                        r._field == "ldr" and
+                        contains(value: r.sensor, set: {self._flux_set(sensor_ids)})
+                    )
+                    |> mean()
+                '''
+            result = self.query_api.query(query)
+
+            return self._value_by_sensor(result)
+        except Exception as e:
+            self.logger.error(f"Exception: {e}")
+
+    def load_predictions_mean_bulk(self, time_window: str, sensor_ids: list[str]) -> dict[str, float]:
+        """
+        Load the mean of the next `time_window` predicted samples for several sensors with a single query.
+
+        The mean is computed by InfluxDB, so only one value per sensor is transferred.
+
+        Parameters
+        ----------
+        time_window : str
+            The time range to fetch data (e.g., '1h', '7d').
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        dict[str, float]
+            The mean predicted value for each sensor ID. Sensors without predictions are missing.
+        """
+        try:
+            # Query InfluxDB for the mean over the specified time window of all the sensors at once
+            query = f'''
+                import "experimental"
+                from(bucket: "{self.db_cfg['bucket']}")
+                    |> range(start: now(), stop: experimental.addDuration(d: {time_window}, to: now()))
+                    |> filter(fn: (r) =>
+                        r._measurement == "ldrValue" and
+                        r._field == "pred" and
+                        contains(value: r.sensor, set: {self._flux_set(sensor_ids)})
+                    )
+                    |> mean()
+                '''
+            result = self.query_api.query(query)
+
+            return self._value_by_sensor(result)
+        except Exception as e:
+            self.logger.error(f"Exception: {e}")
+
+    @staticmethod
+    def _value_by_sensor(result) -> dict[str, float]:
+        """
+        Map the single value of each table returned by an aggregating query to its sensor.
+
+        Parameters
+        ----------
+        result : TableList
+            Result of the Flux query.
+
+        Returns
+        -------
+        dict[str, float]
+            The value for each sensor ID.
+        """
+        values = {}
+        for table in result:
+            for record in table.records:
+                if record.get_value() is not None:
+                    values[record.values.get('sensor')] = float(record.get_value())
+        return values
+
+    @staticmethod
+    def _flux_set(sensor_ids: list[str]) -> str:
+        """
+        Format the sensor IDs as a Flux array of strings.
+
+        Parameters
+        ----------
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        str
+            The Flux array literal (e.g., '["1", "2"]').
+        """
+        return "[" + ", ".join(f'"{sensor_id}"' for sensor_id in sensor_ids) + "]"
+
+    def _query_timeseries(self, query: str) -> pd.DataFrame:
+        """
+        Run a Flux query returning `_time` as uint nanoseconds and load its result in a DataFrame.
+
+        The result is parsed into a DataFrame as a whole, without iterating over the records.
+        Only the `_time`, `_value` and `sensor` columns are expected to be kept by the query.
+
+        Parameters
+        ----------
+        query : str
+            The Flux query.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame with columns `ds` (naive Europe/Rome timestamps), `y` (values)
+            and `sensor` (sensor IDs).
+        """
+        df = self.query_api.query_data_frame(query, data_frame_index=None)
+        if isinstance(df, list):
+            df = pd.concat(df, ignore_index=True) if df else pd.DataFrame()
+        if df.empty:
+            return pd.DataFrame(columns=['ds', 'y', 'sensor'])
+
+        df = df.rename(columns={'_time': 'ds', '_value': 'y'})
+
+        # The uint nanoseconds are reinterpreted as UTC timestamps without copying, and
+        # turned into local wall time with a single conversion
+        utc = pd.DatetimeIndex(df['ds'].to_numpy(dtype=np.int64).view('datetime64[ns]'), tz='UTC')
+        df['ds'] = utc.tz_convert(self.tz).tz_localize(None)
+        return df[['ds', 'y', 'sensor']]
+
+    def _split_by_sensor(self, df: pd.DataFrame, sensor_ids: list[str]) -> dict[str, pd.DataFrame]:
+        """
+        Split the result of a multi-sensor query into one DataFrame per sensor.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Result of the Flux query, with columns `ds`, `y` and `sensor`.
+        sensor_ids : list[str]
+            Identifiers of the sensors.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            A DataFrame for each sensor ID with columns `ds` (timestamps) and `y` (values).
+        """
+        groups = {sensor_id: group[['ds', 'y']].reset_index(drop=True) for sensor_id, group in df.groupby('sensor')}
+
+        dfs = {}
+        for sensor_id in sensor_ids:
+            sensor_df = groups.get(sensor_id)
+
+            # Validate if data is sufficient
+            if sensor_df is None or sensor_df.dropna().shape[0] < 2:
+                sensor_df = pd.DataFrame(columns=['ds', 'y'])
+            dfs[sensor_id] = sensor_df
+        return dfs
@@ -16,6 +16,7 @@ limitations under the License.
 
 import datetime
 import logging
+import re
 import numpy as np
 import aiocoap
 import aiocoap.resource as resource
@@ -27,6 +28,12 @@ from sensorInfo.position import Position
 from comm.mqtt_client import MqttClient
 from comm.db_client import DBClient
 
+# Number of LDR samples kept in memory, one day at the default 10s sampling period
+TIMESERIES_WINDOW = 8640
+
+# `key=value` pairs of the CoAP PUT payload (e.g., b"sensor_id=1&location=kitchen&data=42.00")
+PAYLOAD_PARAM_RE = re.compile(rb'(\w+)=([^&]*)')
+
 class LdrSensorManager(resource.Resource):
     """
     A manager class for Light-Dependent Resistor (LDR) sensors. Handles CoAP communication,
@@ -51,8 +58,12 @@ class LdrSensorManager(resource.Resource):
     ns_sampling_period : int
         Updated sampling period, applied dynamically if changed.
     ldr_timeseries : np.array
-        Stores the time-series data for LDR values.
-    coap_ldr_value : int
+        Ring buffer storing the last `TIMESERIES_WINDOW` LDR values.
+    ldr_timeseries_idx : int
+        Position of `ldr_timeseries` where the next LDR value is written.
+    ldr_timeseries_len : int
+        Number of LDR values stored in `ldr_timeseries`.
+    coap_ldr_value : float
         Latest LDR value received via CoAP communication.
     """
 
@@ -86,18 +97,18 @@ class LdrSensorManager(resource.Resource):
 
         self.LDR_start_timeseries = datetime.datetime.now()
         self.coap_cfg = coap_cfg
+        self.position = position.replace(sensor_id=sensor_id)
         self.mqtt_client = MqttClient(mqtt_cfg['ip'], mqtt_cfg['port'], mqtt_cfg['user'], mqtt_cfg['password'],
-                                      sensor_id, position, sampling_period)
+                                      sensor_id, self.position, sampling_period)
         self.influxdb_client = DBClient(influxdb_cfg['token'], influxdb_cfg['org'], influxdb_cfg['url'], influxdb_cfg['bucket'])
         self.sensor_id = sensor_id
-        self.plant = plant
-        self.plant.sensor_id = sensor_id
-        self.position = position
-        self.position.sensor_id = sensor_id
+        self.plant = plant.replace(sensor_id=sensor_id)
         self.cs_sampling_period = sampling_period
         self.ns_sampling_period = sampling_period
         self.coap_ldr_value = 0
-        self.ldr_timeseries = np.array([], dtype=int)
+        self.ldr_timeseries = np.empty(TIMESERIES_WINDOW, dtype=np.float32)
+        self.ldr_timeseries_idx = 0
+        self.ldr_timeseries_len = 0
         self.ldr_timeseries_avg = 0
         self.predicted_ldr_avg = 0
 
@@ -105,7 +116,13 @@ class LdrSensorManager(resource.Resource):
         """
         Prints basic information about the sensor configuration.
         """
-        self.logger.debug(f"ID: {self.sensor_id}, position: {self.position.name}, sampling period: {self.cs_sampling_period}")
+        self.logger.debug("ID: %s, position: %s, sampling period: %s", self.sensor_id, self.position.name, self.cs_sampling_period)
+
+    def close(self) -> None:
+        """
+        Flushes the values still queued for the database and closes the database client.
+        """
+        self.influxdb_client.close()
 
     async def render_put(self, request: Message) -> Message:
         """
@@ -119,17 +136,24 @@ class LdrSensorManager(resource.Resource):
         Returns
         -------
         response: Message
-            Response indicating the request was successfully processed.
+            Response indicating the request was successfully processed, or a bad request
+            if the payload carries no valid LDR value.
         """
-        decoded_string = request.payload.decode('utf-8')
-        query_params = dict(param.split('=') for param in decoded_string.split('&'))
+        query_params = dict(PAYLOAD_PARAM_RE.findall(request.payload))
+
+        try:
+            data = float(query_params[b'data'])
+        except Exception as e:
+            self.logger.error(f"Exception: {e}")
+            return Message(code=aiocoap.BAD_REQUEST)
 
-        sensor_id = query_params.get('sensor_id')
-        location = query_params.get('location')
-        data = query_params.get('data')
-        self.logger.info(f"CoAP message received: ID({sensor_id}) - position({location}) - value({data}%)")
+        # The sender details are only decoded to be logged
+        if self.logger.isEnabledFor(logging.INFO):
+            sensor_id = query_params.get(b'sensor_id', b'').decode('utf-8')
+            location = query_params.get(b'location', b'').decode('utf-8')
+            self.logger.info("CoAP message received: ID(%s) - position(%s) - value(%s%%)", sensor_id, location, data)
 
-        self.store_value(query_params)
+        self.store_value(data)
         response = Message(code=aiocoap.CHANGED, payload=self.put_response_p.encode('utf-8'))
         return response
 
@@ -163,14 +187,35 @@ class LdrSensorManager(resource.Resource):
 
         self.mqtt_client.update_sensor(position, sampling_period)
 
-    def store_value(self, content: dict[str, str]) -> None:
+    def store_value(self, ldr_value: float) -> None:
         """
         Stores the received LDR sensor value and timestamp in the database.
 
+        The value is only queued on the batching writer of the database client, so
+        the event loop is not blocked by the write.
+
         Parameters
         ----------
-        content : dict[str, str]
-            Dictionary containing CoAP message parameters.
+        ldr_value : float
+            LDR value carried by the CoAP message.
+        """
+        self.coap_ldr_value = ldr_value
+        self.influxdb_client.store_value("ldrValue", "ldr", self.sensor_id, self.coap_ldr_value)
+
+        # Overwrite the oldest value once the buffer is full
+        self.ldr_timeseries[self.ldr_timeseries_idx] = self.coap_ldr_value
+        self.ldr_timeseries_idx = (self.ldr_timeseries_idx + 1) % TIMESERIES_WINDOW
+        self.ldr_timeseries_len = min(self.ldr_timeseries_len + 1, TIMESERIES_WINDOW)
+
+    def get_timeseries(self) -> np.ndarray:
+        """
+        Returns the LDR values stored in memory, from the oldest to the latest.
+
+        Returns
+        -------
+        np.ndarray
+            Contiguous array of the last `TIMESERIES_WINDOW` LDR values at most.
         """
-        self.coap_ldr_value = content.get('data')
-        self.influxdb_client.store_value("ldrValue", "ldr", self.sensor_id, self.coap_ldr_value)
\ No newline at end of file
+        if self.ldr_timeseries_len < TIMESERIES_WINDOW:
+            return self.ldr_timeseries[:self.ldr_timeseries_len].copy()
+        return np.roll(self.ldr_timeseries, -self.ldr_timeseries_idx)
@@ -16,15 +16,19 @@ limitations under the License.
 
 import logging
 import asyncio
-import paho.mqtt.client as mqtt
+import json
+import aiomqtt
 
 from sensorInfo import Position
 
+# Seconds to wait before connecting again after the connection to the broker is lost
+RECONNECT_DELAY = 5
+
 
 class MqttClient():
     """
     MQTT Client manager for handling the connection and communication with an MQTT broker.
-    Publishes sensor configuration updates at regular intervals.
+    Publishes the sensor configuration to the broker whenever it changes.
     
     Attributes
     ----------
@@ -32,14 +36,18 @@ class MqttClient():
         Logger instance for logging MQTT-related messages.
     mqtt_cfg : dict
         Configuration settings for the MQTT connection, including IP, port, username, password, etc.
-    client : mqtt.Client
-        The MQTT client instance used to manage the connection.
+    client : aiomqtt.Client
+        The asyncio MQTT client, available while `periodic_publish` is connected to the broker.
     sensor_id : str
         The unique identifier for the sensor managed by this client.
     position : Position
         The position of the sensor.
     sampling_period : int
         The sampling period in seconds for data collection.
+    config_payload : bytes
+        The JSON configuration payload, serialized whenever the configuration changes.
+    last_published : bytes
+        The last configuration payload published to the broker.
     """
 
     def __init__(self, mqtt_ip: str, mqtt_port: int, mqtt_user: str, mqtt_password: str,
@@ -76,13 +84,25 @@ class MqttClient():
         }
         """MQTT configuration for the node."""
         
-        self.client = mqtt.Client()
-        self.client.on_connect = self.on_connect
-        self.client.username_pw_set(self.mqtt_cfg['username'], self.mqtt_cfg['password'])
+        self.client: aiomqtt.Client | None = None
 
         self.sensor_id = sensor_id
         self.position = position
         self.sampling_period = sampling_period
+        self.config_payload = self.serialize_config()
+        self.last_published: bytes | None = None
+
+    def serialize_config(self) -> bytes:
+        """
+        Serializes the position and sampling period of the sensor into the configuration payload.
+
+        Returns
+        -------
+        bytes
+            The JSON configuration payload.
+        """
+        return json.dumps({"sampling_period": self.sampling_period,
+                           "position": self.position.name}, separators=(',', ':')).encode()
 
     def update_sensor(self, position: Position, sampling_period: int):
         """
@@ -97,34 +117,9 @@ class MqttClient():
         """
         self.position = position
         self.sampling_period = sampling_period
+        self.config_payload = self.serialize_config()
 
-    def on_connect(self, client, userdata, flags, rc) -> None:
-        """
-        Callback function that is called when the client successfully connects to the MQTT broker.
-
-        Parameters
-        ----------
-        rc : int
-            The return code from the broker indicating the connection status.
-        """
-        self.logger.info(f"Connected to MQTT broker, rc={rc}")
-
-    def mqtt_connect(self) -> None:
-        """
-        Establishes the connection to the MQTT broker using the configured settings.
-        Starts the MQTT client's loop for managing communication.
-        """
-        self.client.connect(self.mqtt_cfg['ip'], self.mqtt_cfg['port'], self.mqtt_cfg['keep_alive'])
-        self.client.loop_start()
-
-    def mqtt_disconnect(self) -> None:
-        """
-        Disconnects from the MQTT broker and stops the MQTT client's loop.
-        """
-        self.client.loop_stop()
-        self.client.disconnect()
-
-    def mqtt_publish(self, topic: str, payload: None, qos: int = 2) -> None:
+    async def mqtt_publish(self, topic: str, payload: None, qos: int = 2, retain: bool = False) -> None:
         """
         Publishes a message to a specified MQTT topic.
 
@@ -136,32 +131,43 @@ class MqttClient():
             The content of the message being sent. Can be a string, int, float, or other types.
         qos : int, optional, default: 2
             The Quality of Service level to use for the message (0, 1, or 2).
+        retain : bool, optional, default: False
+            Whether the broker should retain the message for the future subscribers.
         """
-        self.logger.debug(f"Publishing to topic '{topic}' with payload '{payload}' and QoS {qos}")
-        self.client.publish(topic, payload, qos=qos)
+        self.logger.debug("Publishing to topic '%s' with payload '%s' and QoS %s", topic, payload, qos)
+        await self.client.publish(topic, payload, qos=qos, retain=retain)
 
     async def periodic_publish(self) -> None:
         """
-        Periodically publishes sensor configuration (position and sampling period) to the MQTT broker.
-        Runs in an asynchronous loop and publishes every 5 seconds.
+        Publishes the sensor configuration (position and sampling period) to the MQTT broker.
+        Runs in an asynchronous loop and checks for a new configuration every 5 seconds.
 
-        This method connects to the MQTT broker, continuously publishes sensor data, 
-        and then disconnects once done.
+        The position and sampling period are sent together as a single JSON payload on
+        `home/ldr<id>/config`, and only when they differ from the last published ones.
+        The message is retained by the broker, so a node waking up from deep sleep
+        receives the current configuration as soon as it subscribes.
 
-        Parameters
-        ----------
-        sensor_id : str
-            The sensor's unique identifier to be published.
-        sampling_period : int
-            The sampling period of the sensor to be published.
-        position : Position
-            The position of the sensor to be published.
+        aiomqtt does not reconnect by itself: when the connection to the broker is lost,
+        it connects again after `RECONNECT_DELAY` seconds and publishes the configuration again.
         """
-        self.mqtt_connect()
-        try:
-            while True:
-                self.mqtt_publish(f"home/ldr{self.sensor_id}/sampling_period", self.sampling_period)
-                self.mqtt_publish(f"home/ldr{self.sensor_id}/position", self.position.name)
-                await asyncio.sleep(5)
-        finally:
-            self.mqtt_disconnect()
+        while True:
+            try:
+                async with aiomqtt.Client(hostname=self.mqtt_cfg['ip'],
+                                          port=self.mqtt_cfg['port'],
+                                          username=self.mqtt_cfg['username'],
+                                          password=self.mqtt_cfg['password'],
+                                          keepalive=self.mqtt_cfg['keep_alive']) as client:
+                    self.client = client
+                    self.last_published = None
+                    self.logger.info("Connected to MQTT broker")
+                    while True:
+                        payload = self.config_payload
+                        if payload != self.last_published:
+                            await self.mqtt_publish(f"home/ldr{self.sensor_id}/config", payload, retain=True)
+                            self.last_published = payload
+                        await asyncio.sleep(5)
+            except aiomqtt.MqttError as e:
+                self.logger.error(f"Exception: {e}")
+            finally:
+                self.client = None
+            await asyncio.sleep(RECONNECT_DELAY)
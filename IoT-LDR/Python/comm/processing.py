@@ -14,18 +14,25 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import os
+from functools import lru_cache
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from dateutil.easter import easter
 import logging
-from sklearn.preprocessing import StandardScaler
 
-from comm import LdrSensorManager
 from comm import DBClient
 from tools import *
 
+# Numba is optional: when installed, the rolling statistics of the outlier detection are JIT compiled
+try:
+    import numba
+    ROLLING_ENGINE = "numba"
+except ImportError:
+    ROLLING_ENGINE = "cython"
+
 # Set up logger for processing unit
 logger = logging.getLogger("processing unit")
 logger.setLevel(logging.INFO)
@@ -37,23 +44,57 @@ class CmdStanpyFilter(logging.Filter):
 
 logging.getLogger("cmdstanpy").addFilter(CmdStanpyFilter())
 
-from datetime import datetime, timedelta
-from dateutil.easter import easter
+# Directory where the fitted models are saved, so that they survive a restart
+MODELS_DIR = "models"
+
+# Last fitted model of each sensor, along with the modification time of its saved copy,
+# used to warm-start the next fit
+fitted_models: dict[str, tuple[int, Prophet]] = {}
+
+def easter_dates(years: np.ndarray) -> np.ndarray:
+    """
+    Computes the Gregorian Easter Sunday of each year with the Meeus/Jones/Butcher algorithm.
+
+    Parameters
+    ----------
+    years : np.ndarray
+        Integer array of years.
+
+    Returns
+    -------
+    np.ndarray
+        Array of `datetime64[D]` Easter Sundays, one for each year.
+    """
+    y = np.asarray(years, dtype=np.int32)
+    a = y % 19
+    b, c = y // 100, y % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+
+    # Assemble the dates from the first day of each year
+    first_days = (y - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+    return (first_days + (month - 1)).astype('datetime64[D]') + (day - 1)
 
+@lru_cache(maxsize=8)
 def generate_holidays(start_year: int, end_year: int) -> pd.DataFrame:
     """
     Generates a DataFrame of weekends and public holidays in Italy between the specified years.
+
+    The DataFrame is cached for each pair of years and shared among the callers,
+    so it must not be modified.
     """
-    # Generate a list of dates for weekends
-    weekends = []
-    for year in range(start_year, end_year + 1):
-        start_date = datetime(year, 1, 1)
-        end_date = datetime(year, 12, 31)
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.weekday() in [5, 6]:  # Saturday (5) and Sunday (6)
-                weekends.append(current_date)  # Ensure datetime.datetime type
-            current_date += timedelta(days=1)
+    years = range(start_year, end_year + 1)
+
+    # Generate the weekends of all the years at once
+    dates = pd.date_range(f"{start_year}-01-01", f"{end_year}-12-31", freq='D')
+    weekends = dates[dates.weekday >= 5]  # Saturday (5) and Sunday (6)
 
     # Define fixed-date holidays in Italy
     fixed_holidays = [
@@ -69,20 +110,14 @@ def generate_holidays(start_year: int, end_year: int) -> pd.DataFrame:
         "12-26",  # St. Stephen's Day
     ]
 
-    holidays = []
-    for year in range(start_year, end_year + 1):
-        # Add fixed-date holidays
-        for holiday in fixed_holidays:
-            holiday_date = datetime.strptime(f"{year}-{holiday}", "%Y-%m-%d")
-            holidays.append(holiday_date)
-        
-        # Add Easter Monday (Pasquetta)
-        easter_monday = easter(year) + timedelta(days=1)
-        holidays.append(datetime(easter_monday.year, easter_monday.month, easter_monday.day))  # Ensure datetime.datetime type
+    # Add fixed-date holidays
+    holidays = pd.to_datetime([f"{year}-{holiday}" for year in years for holiday in fixed_holidays])
+
+    # Add Easter Monday (Pasquetta)
+    easter_mondays = pd.DatetimeIndex(easter_dates(np.arange(start_year, end_year + 1)) + np.timedelta64(1, 'D'))
 
-    # Combine weekends and holidays, removing duplicates
-    all_holidays = list(set(weekends + holidays))
-    all_holidays.sort()
+    # Combine weekends and holidays, removing duplicates and sorting
+    all_holidays = weekends.union(holidays).union(easter_mondays)
 
     # Create a DataFrame with holidays
     holidays_df = pd.DataFrame({
@@ -92,52 +127,201 @@ def generate_holidays(start_year: int, end_year: int) -> pd.DataFrame:
 
     return holidays_df    
 
+
+def new_model(holidays: pd.DataFrame, time_series_df: pd.DataFrame) -> Prophet:
+    """
+    Creates the Prophet model used to predict the LDR sensor readings.
+
+    The uncertainty intervals are estimated with 200 samples instead of the default 1000,
+    which dominate the cost of `predict` and are only used to store the bounds.
+    The seasonalities that the time series is too short to identify are disabled, and
+    only the holidays close to the time series are kept.
+
+    Parameters
+    ----------
+    holidays : pd.DataFrame
+        The holidays, as returned by `generate_holidays`.
+    time_series_df : pd.DataFrame
+        The time series the model will be fitted on, with column 'ds' (datetime).
+
+    Returns
+    -------
+    Prophet
+        The model, not fitted yet.
+    """
+    start, end = time_series_df['ds'].min(), time_series_df['ds'].max()
+    span = end - start
+
+    holidays = holidays[holidays['ds'].between(start - pd.Timedelta(days=7), end + pd.Timedelta(days=7))]
+    if holidays.empty:
+        holidays = None
+
+    return Prophet(interval_width=0.75, uncertainty_samples=200, mcmc_samples=0,
+                   daily_seasonality=span >= pd.Timedelta(days=2), weekly_seasonality=span >= pd.Timedelta(days=14),
+                   yearly_seasonality=False, holidays=holidays)
+
+
+def warm_start_params(model: Prophet) -> dict:
+    """
+    Extracts the parameters of a fitted Prophet model, to be used as initialization of the next fit.
+
+    Parameters
+    ----------
+    model : Prophet
+        The fitted Prophet model.
+
+    Returns
+    -------
+    dict
+        The initial values of `k`, `m`, `sigma_obs`, `delta` and `beta`.
+    """
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0][0]
+        else:
+            params[name] = np.mean(model.params[name])
+    for name in ['delta', 'beta']:
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0]
+        else:
+            params[name] = np.mean(model.params[name], axis=0)
+    return params
+
+
+def load_fitted_model(sensor_id: str) -> Prophet | None:
+    """
+    Returns the last model fitted for a sensor, loading it from `MODELS_DIR` when the copy
+    in memory is missing or outdated.
+
+    Parameters
+    ----------
+    sensor_id : str
+        The sensor ID.
+
+    Returns
+    -------
+    Prophet | None
+        The last fitted model, or None if the sensor has never been fitted.
+    """
+    path = os.path.join(MODELS_DIR, f"ldr{sensor_id}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        # The fits may run in different worker processes, so the model in memory is
+        # reused only if no other process saved a newer one
+        mtime = os.stat(path).st_mtime_ns
+        cached = fitted_models.get(sensor_id)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'r') as f:
+            model = model_from_json(f.read())
+        fitted_models[sensor_id] = (mtime, model)
+        return model
+    except Exception as e:
+        # A stale or corrupted model is discarded, the next fit starts from scratch
+        logger.debug("Discarding saved model of LDR%s: %s", sensor_id, e)
+        return None
+
+
+def save_fitted_model(sensor_id: str, model: Prophet) -> None:
+    """
+    Keeps the model fitted for a sensor in memory and saves it in `MODELS_DIR`.
+
+    Parameters
+    ----------
+    sensor_id : str
+        The sensor ID.
+    model : Prophet
+        The fitted Prophet model.
+    """
+    try:
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        path = os.path.join(MODELS_DIR, f"ldr{sensor_id}.json")
+
+        # Write to a temporary file first, so that a crash or another worker never sees a partial model
+        with open(path + ".tmp", 'w') as f:
+            f.write(model_to_json(model))
+        os.replace(path + ".tmp", path)
+        fitted_models[sensor_id] = (os.stat(path).st_mtime_ns, model)
+    except Exception as e:
+        logger.error(f"Exception: {e}")
+
     
-def model_predict(ldr_sensor: LdrSensorManager, influxdb_cfg: dict[str, str], holidays: pd.DataFrame) -> None:
+def forecast(sensor_id: str, influxdb_cfg: dict[str, str], holidays: pd.DataFrame) -> pd.DataFrame | None:
     """
     Uses the Prophet model to predict future LDR sensor readings based on the past 24 hours of data.
     
     This function connects to a database to retrieve the LDR sensor's time-series data, 
     preprocesses it, and then uses Prophet to forecast future readings based on that data.
-    The predictions are then stored back into the database.
+    The predictions are returned, so that they can be stored by the caller.
 
     Parameters
     ----------
-    ldr_sensor : LdrSensorManager
-        The LDR sensor object that holds sensor information such as the sensor ID and sampling period.
+    sensor_id : str
+        The ID of the LDR sensor. Only the ID is passed, so that the function can run
+        in a worker process.
         
     influxdb_cfg : dict[str, str]
         A dictionary containing the configuration for connecting to the InfluxDB instance.
         Expected keys: 'token', 'org', 'url', 'bucket'.
     
+    holidays : pd.DataFrame
+        The holidays, as returned by `generate_holidays`.
+    
     Returns
     ------
-    None
-        This function does not return anything. The predictions are stored in the database.
+    pd.DataFrame | None
+        The predictions, with columns `ds`, `yhat`, `yhat_lower` and `yhat_upper`,
+        or None if the prediction failed.
     
     Raises
     ------
     Exception
         If any error occurs during the prediction process, it will be caught and logged.
     """
-    scaler = StandardScaler()
-
     # Initialize the DB client with the given configuration
     db_client = DBClient(influxdb_cfg['token'], influxdb_cfg['org'], influxdb_cfg['url'], influxdb_cfg['bucket'])
 
     # Load the past 24 hours of LDR sensor data from the database
-    time_series_df = db_client.load_timeseries("inf", ldr_sensor.sensor_id)
+    time_series_df = db_client.load_timeseries("inf", sensor_id)
+    if time_series_df is None or time_series_df.empty:
+        logger.info("No data to predict for LDR%s", sensor_id)
+        db_client.close()
+        return None
+
+    # The readings are percentages of a 12-bit ADC value, single precision is enough
+    time_series_df['y'] = pd.to_numeric(time_series_df['y'], downcast='float')
     
     # Preprocess the time series data to remove outliers
     time_series_preprocess_df = preprocess_timeseries(time_series_df, 0.8, window_size="4h")
-    y_values = time_series_preprocess_df['y'].values.reshape(-1, 1)
-    time_series_preprocess_df['y'] = scaler.fit_transform(y_values)
+
+    # Standardize the values, a constant series is only centered.
+    # The statistics are accumulated in double precision, the values stay in single precision
+    y_values = time_series_preprocess_df['y'].to_numpy(dtype=np.float32)
+    y_mean, y_std = float(y_values.mean(dtype=np.float64)), float(y_values.std(dtype=np.float64))
+    if y_std == 0:
+        y_std = 1.0
+    time_series_preprocess_df['y'] = ((y_values - y_mean) / y_std).astype(np.float32, copy=False)
 
     # Create and fit the Prophet model on the preprocessed data
-    model = Prophet(interval_width=0.75, daily_seasonality=True, weekly_seasonality=True, yearly_seasonality=False, holidays=holidays)
+    model = new_model(holidays, time_series_preprocess_df)
 
     try:
-        model.fit(time_series_preprocess_df)
+        # Start from the parameters of the previous fit, which are close to the new optimum
+        previous_model = load_fitted_model(sensor_id)
+        if previous_model is None:
+            model.fit(time_series_preprocess_df)
+        else:
+            try:
+                model.fit(time_series_preprocess_df, init=warm_start_params(previous_model))
+            except Exception as e:
+                # The parameters do not fit the new model (e.g., the holidays changed), fit from scratch
+                logger.debug("Warm start failed: %s", e)
+                model = new_model(holidays, time_series_preprocess_df)
+                model.fit(time_series_preprocess_df)
+        save_fitted_model(sensor_id, model)
 
         # Generate predictions for the next period based on the sensor's sampling period
         # future_points = model.make_future_dataframe(periods=int((60*1) / influxdb_cfg['prediction_period_min']), freq=f'{influxdb_cfg['prediction_period_min']}min')
@@ -151,22 +335,25 @@ def model_predict(ldr_sensor: LdrSensorManager, influxdb_cfg: dict[str, str], ho
         
         # Get the predicted values for the future points
         pred_df = model.predict(future_points)
-        pred_df['yhat'] = scaler.inverse_transform(pred_df[['yhat']])
-        pred_df['yhat_lower'] = scaler.inverse_transform(pred_df[['yhat_lower']])
-        pred_df['yhat_upper'] = scaler.inverse_transform(pred_df[['yhat_upper']])
+        # Map the predictions and their bounds back to the original scale at once
+        pred_columns = ['yhat', 'yhat_lower', 'yhat_upper']
+        pred_df[pred_columns] = pred_df[pred_columns].to_numpy() * y_std + y_mean
         future_val = pred_df[pred_df['ds'] >= start_timestamp]  # Filter future values after current time
-        logger.debug(f"Predicted {future_val['yhat'].shape[0]} future points")
+        logger.debug("Predicted %d future points", future_val['yhat'].shape[0])
 
         # Log the predictions for the sensor
-        logger.info(f"Predicted: lower({future_val['yhat_lower'].values[0]:.2f}), pred({future_val['yhat'].values[0]:.2f}), upper({future_val['yhat_upper'].values[0]:.2f})")
-        list(map(lambda x: logger.debug(f"{x: .2f}"), future_val['yhat'].values))
-        list(map(lambda x: logger.debug(f"{x}"), future_val['ds'].values))
-        # Store the predictions back in the database
-        db_client.store_predictions(future_val, ldr_sensor.sensor_id)
-        db_client.store_predictions_lower(future_val, ldr_sensor.sensor_id)
-        db_client.store_predictions_upper(future_val, ldr_sensor.sensor_id)
+        logger.info("Predicted: lower(%.2f), pred(%.2f), upper(%.2f)", future_val['yhat_lower'].values[0], future_val['yhat'].values[0], future_val['yhat_upper'].values[0])
+        if logger.isEnabledFor(logging.DEBUG):
+            for x in future_val['yhat'].values:
+                logger.debug("% .2f", x)
+            for x in future_val['ds'].values:
+                logger.debug("%s", x)
+        return future_val[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
     except Exception as e:
         logger.error(f"Exception: {e}")
+        return None
+    finally:
+        db_client.close()
 
 
 def preprocess_timeseries(time_series_df: pd.DataFrame, std_threshold: float, window_size: str = "1h") -> pd.DataFrame:
@@ -199,40 +386,21 @@ def preprocess_timeseries(time_series_df: pd.DataFrame, std_threshold: float, wi
     This function uses the rolling mean and standard deviation to identify and remove outliers.
     The function assumes that the 'ds' column contains datetime values and the 'y' column contains the sensor data.
     """
-    # Make a copy of the time series data to avoid modifying the original data
-    time_series_copy_df = time_series_df.copy()
-    
-    # Set the 'ds' column as the index
-    time_series_copy_df.set_index('ds', inplace=True)
+    # Index the values by time, without copying the whole DataFrame
+    y_series = pd.Series(time_series_df['y'].to_numpy(), index=pd.DatetimeIndex(time_series_df['ds']))
     
     # Calculate rolling mean and standard deviation over the specified window size
-    rolling_window = time_series_copy_df.rolling(window_size)
-    mean_series = rolling_window.mean()
-    std_series = rolling_window.std()
-    
-    # List of indices to be removed (outliers)
-    remove_idx = []
-    
-    # Check each data point for being an outlier
-    for idx, val in time_series_copy_df['y'].items():
-        mean = mean_series.loc[idx] if idx in mean_series.index else None
-        std = std_series.loc[idx] if idx in std_series.index else None
-        
-        # If the mean or std is not available for a point, skip it
-        if mean is None or std is None:
-            continue
-
-        # Calculate the threshold for outlier detection
-        threshold = std_threshold * std['y']
-        if abs(val - mean['y']) > threshold:
-            remove_idx.append(idx)
+    rolling_window = y_series.rolling(window_size)
+    mean_series = rolling_window.mean(engine=ROLLING_ENGINE)
+    std_series = rolling_window.std(engine=ROLLING_ENGINE)
     
-    # Drop the outliers from the time series data
-    time_series_processed_df = time_series_copy_df.drop(remove_idx)
+    # Outliers deviate from the rolling mean by more than the threshold, points
+    # without a standard deviation (e.g., the first one) are always kept
+    deviation = (y_series - mean_series).abs()
+    outliers = (deviation > std_threshold * std_series).to_numpy()
     
-    # Reset index and return the cleaned DataFrame
-    time_series_copy_df.reset_index(inplace=True)
-    time_series_processed_df.reset_index(inplace=True)
+    # Keep only the rows that are not outliers, the original data is left untouched
+    time_series_processed_df = time_series_df.loc[~outliers, ['ds', 'y']].reset_index(drop=True)
 
     time_series_processed_df['y'] = pd.to_numeric(time_series_processed_df['y'], errors='coerce')
     time_series_processed_df.dropna(subset=['y'], inplace=True)
@@ -5,11 +5,13 @@ License: Apache License, Version 2.0
 """
 
 import asyncio
-import json
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-from comm import LdrSensorManager, model_predict, generate_holidays
+from comm import LdrSensorManager, DBClient, forecast, generate_holidays
 from sensorInfo import *
 from tools import *
 
@@ -32,6 +34,9 @@ last_holiday_day = -1
 last_pred_hour: int = -1
 last_pred_min: int = -1
 
+# Minutes of each hour at which the predictions are performed
+PREDICTION_MINUTES = frozenset({0, 15, 30, 45})
+
 async def load_default_config() -> dict:
     """
     Load default configurations from the JSON file.
@@ -42,8 +47,7 @@ async def load_default_config() -> dict:
         Dictionary containing the default configurations.
     """
     logger.debug("Loading default configurations")
-    with open(r'.\default_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached(r'.\default_config.json')
     
 async def load_sensors_config() -> dict:
     """
@@ -55,8 +59,7 @@ async def load_sensors_config() -> dict:
         Dictionary containing the sensor configurations.
     """
     logger.debug("Loading sensors configurations")
-    with open(r'.\sensors_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached(r'.\sensors_config.json')
     
 async def load_sensors():
     """
@@ -146,7 +149,7 @@ async def reload_sensors():
                 existing_sensor.update_sensor(Position(**sensor_cfg['position']), 
                                               sensor_cfg['sampling_period'], 
                                               Plant(**sensor_cfg['plant']))
-                logger.debug(f"Updated sensor {sensor_id} with new config.")
+                logger.debug("Updated sensor %s with new config.", sensor_id)
                 existing_sensor.print_info()
             else:
                 # Add a new sensor if it doesn't exist
@@ -159,23 +162,22 @@ async def reload_sensors():
                                               Plant(**sensor_cfg['plant']), 
                                               sensor_cfg['sampling_period'])
                 ldr_sensors.append(new_sensor)
-                logger.debug(f"Added new sensor {sensor_id}.")
+                logger.debug("Added new sensor %s.", sensor_id)
     finally:
         logger.debug("Sensor configuration reloaded.")
 
 
 def check_time():
-    """Change of the hour detector.
+    """Prediction slot detector, triggering once every quarter of an hour.
 
     Returns:
-        bool: Whether the hour change.
+        bool: Whether a new prediction slot started.
     """
     global last_pred_hour
     global last_pred_min
     now = datetime.now()
-    if now.hour in [h for h in range(0, 24) if h != last_pred_hour] and now.minute in [m for m in [0, 15, 30, 45] if m!= last_pred_min]:
-        last_pred_hour = now.hour
-        last_pred_min = now.min
+    if now.minute in PREDICTION_MINUTES and (now.hour, now.minute) != (last_pred_hour, last_pred_min):
+        last_pred_hour, last_pred_min = now.hour, now.minute
         return True
     else:
         return False
@@ -213,20 +215,42 @@ async def main():
     await load_sensors()
     current_holidays = generate_holidays(datetime.now().year, datetime.now().date().year + 1)
 
+    # The predictions of all the sensors are stored through a single batching client
+    db_client = DBClient(influxdb_cfg['token'], influxdb_cfg['org'], influxdb_cfg['url'], influxdb_cfg['bucket'])
+
+    # The fits are CPU bound, so each sensor is predicted in its own process.
+    # The workers are spawned rather than forked, since the clients already run their writer threads
+    executor = ProcessPoolExecutor(max_workers=max(1, min(len(ldr_sensors), os.cpu_count() or 1)),
+                                   mp_context=multiprocessing.get_context("spawn"))
+    loop = asyncio.get_running_loop()
+
     welcome_message()
     
-    while True:
-        while current_holidays is None:
-            await asyncio.sleep(1)  # wait for holidays to be initialized
+    try:
+        while True:
+            while current_holidays is None:
+                await asyncio.sleep(1)  # wait for holidays to be initialized
 
-        # Perform in parallel prediction for each sensor
-        if check_time():
-            await asyncio.gather(*[asyncio.to_thread(model_predict, ldr_sensor, influxdb_cfg, current_holidays) for ldr_sensor in ldr_sensors])
-        
-        # Reload sensor configurations to reflect updates
-        await reload_sensors()
-        update_holidays()
-        await asyncio.sleep(1)
+            # Perform in parallel prediction for each sensor
+            if check_time():
+                sensor_ids = [ldr_sensor.sensor_id for ldr_sensor in ldr_sensors]
+                forecasts = await asyncio.gather(*[loop.run_in_executor(executor, forecast, sensor_id, influxdb_cfg, current_holidays) for sensor_id in sensor_ids])
+
+                # The batching client only queues the points, so the predictions are stored in place
+                for sensor_id, future_val in zip(sensor_ids, forecasts):
+                    if future_val is not None:
+                        db_client.store_predictions_all(future_val, sensor_id)
+            
+            # Reload sensor configurations to reflect updates
+            await reload_sensors()
+            update_holidays()
+            await asyncio.sleep(1)
+    finally:
+        # Flush the values still queued for the database
+        for ldr_sensor in ldr_sensors:
+            ldr_sensor.close()
+        db_client.close()
+        executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
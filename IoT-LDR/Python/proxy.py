@@ -15,9 +15,7 @@ limitations under the License.
 """
 
 import asyncio
-import json
 import logging
-from watchdog.observers import Observer
 
 from comm import *  # Communication-related utilities (e.g., MQTT or CoAP handling)
 from tools import *  # General utility functions for the script
@@ -50,8 +48,7 @@ async def load_default_config() -> dict:
         Dictionary containing the default configuration settings.
     """
     logger.debug("Loading default configurations")
-    with open('default_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached('default_config.json')
 
 async def load_sensors_config() -> dict:
     """
@@ -63,8 +60,7 @@ async def load_sensors_config() -> dict:
         Dictionary containing the sensor configuration settings.
     """
     logger.debug("Loading sensors configurations")
-    with open('sensors_config.json', 'r') as f:
-        return json.load(f)
+    return load_json_cached('sensors_config.json')
 
 async def setup_sensors(default_config: dict, sensors_config: dict) -> list[LdrSensorManager]:
     """
@@ -152,7 +148,7 @@ async def reload_sensors() -> None:
                 existing_sensor.update_sensor(Position(**sensor_cfg['position']), 
                                               sensor_cfg['sampling_period'],
                                               Plant(**sensor_cfg['plant']))
-                logger.debug(f"Updated sensor {sensor_id} with new config.")
+                logger.debug("Updated sensor %s with new config.", sensor_id)
                 existing_sensor.print_info()
             else:
                 # Add a new sensor if not already present
@@ -169,7 +165,7 @@ async def reload_sensors() -> None:
                                               sensor_cfg['sampling_period']
                                               )
                 ldr_sensors.append(new_sensor)
-                logger.debug(f"Added new sensor {sensor_id}.")
+                logger.debug("Added new sensor %s.", sensor_id)
     finally:
         logger.debug("Final configuration state.")
 
@@ -204,24 +200,24 @@ async def main() -> None:
     
     # Setup file watcher for dynamic configuration reloads
     loop = asyncio.get_event_loop()
-    event_handler = ConfigFileHandler(loop, reload_sensors)
-    observer = Observer()
-    observer.schedule(event_handler, path='.', recursive=False)
-    observer.start()
+    event_handler = ConfigFileHandler(loop, reload_sensors, ('default_config.json', 'sensors_config.json'))
+    event_handler.start()
     
     # Main loop to handle CoAP and MQTT functionality
-    while True:
-        try:
-            await asyncio.gather(
-                *[ldr.coap_server() for ldr in ldr_sensors],  # Start CoAP servers
-                *[ldr.mqtt_client.periodic_publish() for ldr in ldr_sensors],  # Start periodic MQTT publishing
-                reload_sensors()  # Periodically reload configurations
-            )
-        except Exception as e:
-            logger.error(f"Error occurred: {e}")
-        finally:
-            observer.stop()
-            observer.join()
+    try:
+        while True:
+            try:
+                await asyncio.gather(
+                    *[ldr.coap_server() for ldr in ldr_sensors],  # Start CoAP servers
+                    *[ldr.mqtt_client.periodic_publish() for ldr in ldr_sensors]  # Start periodic MQTT publishing
+                )
+            except Exception as e:
+                logger.error(f"Error occurred: {e}")
+    finally:
+        event_handler.stop()
+        # Flush the values still queued for the database
+        for ldr in ldr_sensors:
+            ldr.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -14,15 +14,17 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import dataclasses
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Plant():
     """
     A dataclass representing a plant.
 
     This class holds information about the plant's type, the amount of sunlight it 
     needs (in hours), and the associated sensor ID for monitoring purposes.
+    Plants are immutable, so an updated plant is a new object.
 
     Attributes
     ----------
@@ -35,8 +37,8 @@ class Plant():
 
     Methods
     -------
-    update_plant(type=None, light_amount=None, sensor_id=None)
-        Updates the plant's attributes with the new values provided.
+    replace(type=None, light_amount=None, sensor_id=None)
+        Returns a copy of the plant with the new values provided.
     """
 
     type: str
@@ -48,13 +50,13 @@ class Plant():
     sensor_id: str
     """The unique identifier for the sensor associated with this plant"""
 
-    def update_plant(self, type: str = None, light_amount: int = None, sensor_id: str = None) -> None:
+    def replace(self, type: str = None, light_amount: int = None, sensor_id: str = None) -> "Plant":
         """
-        Update the plant settings with new values.
+        Return a copy of the plant with new values.
 
         This method allows for updating one or more attributes of the plant object.
-        If any of the parameters are provided (i.e., not None), they will update the 
-        corresponding attributes of the plant.
+        If any of the parameters are provided (i.e., not None), they will replace the 
+        corresponding attributes of the plant in the returned copy.
 
         Parameters
         ----------
@@ -67,12 +69,14 @@ class Plant():
 
         Returns
         -------
-        None
-            This method updates the plant attributes in place and does not return any value.
+        Plant
+            The updated copy of the plant.
         """
+        changes = {}
         if type:
-            self.type = type
+            changes['type'] = type
         if light_amount:
-            self.light_amount = light_amount
+            changes['light_amount'] = light_amount
         if sensor_id:
-            self.sensor_id = sensor_id
+            changes['sensor_id'] = sensor_id
+        return dataclasses.replace(self, **changes)
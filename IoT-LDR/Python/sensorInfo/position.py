@@ -15,9 +15,22 @@ limitations under the License.
 """
 
 import logging
-from dataclasses import dataclass, field
+import sys
+import dataclasses
+from dataclasses import dataclass
+from typing import ClassVar
 
-@dataclass
+# Logger shared by all the positions
+logger = logging.getLogger('Position')
+logger.setLevel(logging.INFO)
+
+# Attributes of a position that can be updated
+POSITION_FIELDS = frozenset({'position_id', 'name', 'description', 'sensor_id'})
+
+# Attributes shared by many positions, whose strings are interned
+INTERNED_FIELDS = ('position_id', 'name', 'sensor_id')
+
+@dataclass(slots=True, frozen=True)
 class Position():
     """
     Sensor position manager.
@@ -26,6 +39,8 @@ class Position():
     management and update of position details (ID, name, description) and the 
     association with a sensor. It includes functionality for logging and updating 
     position details.
+    Positions are immutable, so an updated position is a new object. The IDs and
+    names are interned, since the same ones are shared by many positions.
 
     Attributes
     ----------
@@ -38,12 +53,14 @@ class Position():
     sensor_id : str, optional
         The identifier of the sensor associated with this position. Default is an empty string.
     logger : logging.Logger
-        Logger used for logging position information and updates.
+        Class-level logger used for logging position information and updates.
     
     Methods
     -------
-    update(position_id=None, name=None, description=None, sensor_id=None)
-        Updates the position details with new values. Only non-None values will be updated.
+    replace(position_id=None, name=None, description=None, sensor_id=None)
+        Returns a copy of the position with the new values provided. Only non-None values will be updated.
+    apply(fields)
+        Returns a copy of the position with the values of a dictionary. Only non-None values will be updated.
     print_position()
         Logs the current position details (ID and name).
     """
@@ -52,20 +69,20 @@ class Position():
     name: str          # Name of the position (e.g., "Living Room", "Kitchen")
     description: str   # A description of the position
     sensor_id: str = ""  # Optional sensor ID associated with this position
-    logger: logging.Logger = field(init=False, default=logging.getLogger('Position'))
-    
+    logger: ClassVar[logging.Logger] = logger
+
     def __post_init__(self):
         """
-        Initializes the logger for the Position class.
-        
-        This function is automatically called after the object is initialized
-        by the dataclass. It sets the logger level to INFO.
+        Interns the strings shared by many positions.
         """
-        self.logger.setLevel(logging.INFO)
+        for key in INTERNED_FIELDS:
+            value = getattr(self, key)
+            if type(value) is str:
+                object.__setattr__(self, key, sys.intern(value))
         
-    def update(self, position_id: str = None, name: str = None, description: str = None, sensor_id: str = None) -> None:
+    def replace(self, position_id: str = None, name: str = None, description: str = None, sensor_id: str = None) -> "Position":
         """
-        Update the position details with new values if provided.
+        Return a copy of the position with new values if provided.
         
         This method allows you to modify any of the position's attributes
         (position_id, name, description, sensor_id) by passing in new values.
@@ -83,18 +100,31 @@ class Position():
             New sensor ID associated with the position. If provided, the sensor ID will be updated.
         
         Returns
-        ------
-        None
-            This method does not return anything. It updates the position's attributes in place.
+        -------
+        Position
+            The updated copy of the position.
+        """
+        return self.apply({'position_id': position_id, 'name': name, 'description': description, 'sensor_id': sensor_id})
+
+    def apply(self, fields: dict) -> "Position":
+        """
+        Return a copy of the position with the values of a dictionary.
+
+        The keys that are not attributes of the position and the None values are ignored,
+        so a whole position configuration can be applied at once.
+
+        Parameters
+        ----------
+        fields : dict
+            New values of the position's attributes, by attribute name.
+
+        Returns
+        -------
+        Position
+            The updated copy of the position.
         """
-        if position_id:
-            self.position_id = position_id
-        if name:
-            self.name = name
-        if description:
-            self.description = description
-        if sensor_id:
-            self.sensor_id = sensor_id
+        changes = {key: value for key, value in fields.items() if value is not None and key in POSITION_FIELDS}
+        return dataclasses.replace(self, **changes)
         
     def print_position(self):
         """
@@ -108,4 +138,4 @@ class Position():
         None
             This method does not return anything. It only logs the position details.
         """
-        self.logger.info(f"position:{self.position_id}:{self.name}")
+        logger.info("position:%s:%s", self.position_id, self.name)
@@ -18,14 +18,20 @@ import logging
 
 from .color_format import ColorFormatter
 from .config_file_handler import ConfigFileHandler
+from .config_cache import load_json_cached
 
-__all__ = ['ConfigFileHandler', 'ColorFormatter']
+__all__ = ['ConfigFileHandler', 'ColorFormatter', 'load_json_cached']
 
 console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.INFO)
 
-formatter = ColorFormatter("%(asctime)s - %(name)s : %(message)s", datefmt="%H:%M:%S")
+formatter = ColorFormatter("%(asctime)s - %(name)s : %(message)s", datefmt="%H:%M:%S", stream=console_handler.stream)
 console_handler.setFormatter(formatter)
 
 root_logger = logging.getLogger()
 root_logger.setLevel(logging.INFO)
-root_logger.addHandler(console_handler)
\ No newline at end of file
+
+# Install the console handler only once, even if the package is imported again
+if not any(getattr(handler, 'ldr_console', False) for handler in root_logger.handlers):
+    console_handler.ldr_console = True
+    root_logger.addHandler(console_handler)
\ No newline at end of file
@@ -14,20 +14,89 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from colorama import Fore, Style, init
 import logging
+import sys
+import time
 
-# Initialize colorama to automatically reset colors after each log message.
-init(autoreset=True)
+# Only the Windows console needs colorama to translate the ANSI escape codes,
+# the other terminals understand them natively
+if sys.platform == 'win32':
+    from colorama import init
+    init()
+
+# ANSI color codes
+WHITE = "\033[37m"
+CYAN = "\033[36m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+MAGENTA = "\033[35m"
+
+# Colors of the standard log levels, indexed by level number // 10
+LOG_COLORS = (
+    WHITE,    # NOTSET
+    CYAN,     # DEBUG messages in Cyan
+    GREEN,    # INFO messages in Green
+    YELLOW,   # WARNING messages in Yellow
+    RED,      # ERROR messages in Red
+    MAGENTA,  # CRITICAL messages in Magenta
+)
+LOG_RESET = "\033[0m"
 
 class ColorFormatter(logging.Formatter):
     """
     Custom logging formatter that adds color to log messages based on their severity.
     
-    This formatter uses colorama to format log messages with different colors for
+    This formatter uses ANSI escape codes to format log messages with different colors for
     each logging level: DEBUG, INFO, WARNING, ERROR, and CRITICAL.
+    The colors are left out when the output stream is not a terminal.
     """
 
+    # Second of the last formatted timestamp along with its string
+    time_cache: tuple[int, str] = (-1, "")
+
+    def __init__(self, *args, stream=None, **kwargs):
+        """
+        Initialize the formatter.
+
+        Parameters
+        ----------
+        *args, **kwargs
+            Arguments of `logging.Formatter`.
+        stream : file-like object, optional
+            Stream the formatted records are written to. If it is not a terminal,
+            the records are not colored. Without it, the records are always colored.
+        """
+        super().__init__(*args, **kwargs)
+        isatty = getattr(stream, 'isatty', None)
+        self.colorize = stream is None or (isatty is not None and isatty())
+
+    def formatTime(self, record, datefmt=None):
+        """
+        Format the creation time of the log record, reusing the last string within the same second.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record whose creation time is formatted.
+        datefmt : str, optional
+            Date format string. Without it the default format, which includes milliseconds, is used.
+
+        Returns
+        -------
+        str
+            The formatted creation time.
+        """
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, cached_time = self.time_cache
+        if second != cached_second:
+            cached_time = time.strftime(datefmt, self.converter(second))
+            self.time_cache = (second, cached_time)
+        return cached_time
+
     def format(self, record):
         """
         Format the log record with color based on the log level.
@@ -42,21 +111,18 @@ class ColorFormatter(logging.Formatter):
         str
             The formatted log message with the appropriate color.
         """
-        
-        # Dictionary mapping log levels to colors
-        log_colors = {
-            logging.DEBUG: Fore.CYAN,      # DEBUG messages in Cyan
-            logging.INFO: Fore.GREEN,      # INFO messages in Green
-            logging.WARNING: Fore.YELLOW,  # WARNING messages in Yellow
-            logging.ERROR: Fore.RED,       # ERROR messages in Red
-            logging.CRITICAL: Fore.MAGENTA, # CRITICAL messages in Magenta
-        }
+        # Use the default formatter to format the log record, the record itself is left
+        # untouched so that the other handlers do not see the color codes
+        s = logging.Formatter.format(self, record)
+        if not self.colorize:
+            return s
 
         # Get the color for the current log level, default to white if unknown
-        level_color = log_colors.get(record.levelno, Fore.WHITE)
-
-        # Format the log message with the selected color and reset the color after
-        record.msg = f"{level_color}{record.msg}{Style.RESET_ALL}"
+        levelno = record.levelno
+        if levelno % 10 == 0 and 0 < levelno <= logging.CRITICAL:
+            level_color = LOG_COLORS[levelno // 10]
+        else:
+            level_color = WHITE
 
-        # Use the default formatter to format the rest of the log record
-        return super().format(record)
+        # Color the formatted line and reset the color after
+        return level_color + s + LOG_RESET
@@ -0,0 +1,47 @@
+"""
+Copyright 2024 Lorenzo Grandi
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+     http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import json
+
+# Parsed JSON files along with the modification time they were parsed at
+json_cache: dict[str, tuple[int, dict]] = {}
+
+def load_json_cached(path: str) -> dict:
+    """
+    Load a JSON file, parsing it again only when its modification time changes.
+
+    The returned dictionary is shared by all the callers, so it must not be modified.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON file.
+
+    Returns
+    -------
+    dict
+        Dictionary containing the parsed JSON file.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = json_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        content = json.loads(f.read())
+    json_cache[path] = (mtime, content)
+    return content
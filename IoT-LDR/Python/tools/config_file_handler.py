@@ -16,39 +16,153 @@ limitations under the License.
 
 import logging 
 import asyncio
+import os
 from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
-# Set up logging
+# asyncinotify is optional: when installed (Linux only), the events are read directly in the event loop
+try:
+    from asyncinotify import Inotify, Mask
+except ImportError:
+    Inotify = None
+
+# Set up logging, the level is inherited from the root logger
 logger = logging.getLogger("ConfigFileHandler")
-logger.setLevel(logging.DEBUG)
+
+# Seconds of quiet after the last modification before the callback is run
+DEBOUNCE_DELAY = 0.5
 
 class ConfigFileHandler(FileSystemEventHandler):
     """
-    Custom file system event handler that listens for modifications to a configuration file (config.json)
+    Custom file system event handler that listens for modifications to the watched configuration files
     and triggers a callback function.
+
+    A single save usually fires several modification events, so they are coalesced and the
+    callback runs once, `DEBOUNCE_DELAY` seconds after the last of them.
+
+    The files are watched with inotify from the event loop when asyncinotify is available,
+    otherwise with a watchdog observer thread.
     """
 
-    def __init__(self, loop, on_modified_callback):
+    def __init__(self, loop, on_modified_callback, watched_paths):
         """
         Initializes the event handler.
         
         Parameters:
         loop (asyncio.AbstractEventLoop): The asyncio event loop where the callback will be executed.
         on_modified_callback (coroutine): The callback function to be called when the file is modified.
+        watched_paths (iterable of str): The configuration files to watch.
         """
         self.loop = loop
         self.on_modified_callback = on_modified_callback
+        self.watched_paths = frozenset(os.path.abspath(path) for path in watched_paths)
+        self.watched_dirs = frozenset(os.path.dirname(path) for path in self.watched_paths)
+        self.pending: asyncio.TimerHandle | None = None
+        self.task: asyncio.Task | None = None
+        self.watcher: asyncio.Task | None = None
+        self.observer: Observer | None = None
+
+    def start(self):
+        """
+        Start watching the configuration files. Must be called from the event loop thread.
+        """
+        if Inotify is not None:
+            self.watcher = self.loop.create_task(self.watch())
+        else:
+            self.start_observer()
+
+    def start_observer(self):
+        """
+        Start the watchdog observer thread on the watched directories.
+        """
+        self.observer = Observer()
+        for directory in self.watched_dirs:
+            self.observer.schedule(self, path=directory, recursive=False)
+        self.observer.start()
+
+    def stop(self):
+        """
+        Stop watching the configuration files.
+        """
+        if self.watcher is not None:
+            self.watcher.cancel()
+            self.watcher = None
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    async def watch(self):
+        """
+        Read the inotify events of the watched directories in the event loop.
+
+        The directories are watched instead of the files, so that the files replaced
+        by a rename on save are still followed. If inotify fails, the watchdog observer
+        is used instead.
+        """
+        try:
+            with Inotify() as inotify:
+                for directory in self.watched_dirs:
+                    inotify.add_watch(directory, Mask.MODIFY | Mask.CLOSE_WRITE | Mask.MOVED_TO)
+                async for event in inotify:
+                    if event.path is not None and str(event.path) in self.watched_paths:
+                        self.schedule()
+        except Exception as e:
+            logger.error(f"Exception: {e}")
+            logger.info("Watching the configurations with the watchdog observer.")
+            self.start_observer()
+
+    def dispatch(self, event):
+        """
+        Dispatch only the events of the watched files, the others are dropped before
+        being routed to their handler method.
+        
+        Parameters:
+        event (watchdog.events.FileSystemEvent): The event object containing details about the file change.
+        """
+        if event.src_path in self.watched_paths or getattr(event, 'dest_path', '') in self.watched_paths:
+            super().dispatch(event)
 
     def on_modified(self, event):
         """
-        This method is called when a file modification is detected.
+        This method is called when a modification of a watched file is detected.
         
-        If the modified file is config.json, it logs the event and triggers the callback function.
+        It triggers the callback function.
+        
+        Parameters:
+        event (watchdog.events.FileSystemEvent): The event object containing details about the file change.
+        """
+        # The watchdog thread only hands the event over to the event loop
+        self.loop.call_soon_threadsafe(self.schedule)
+
+    def on_moved(self, event):
+        """
+        This method is called when a watched file is replaced by a rename, as many editors do on save.
         
         Parameters:
         event (watchdog.events.FileSystemEvent): The event object containing details about the file change.
         """
-        if event.src_path.endswith('config.json'):
-            logger.info("New JSON configurations detected.")
-            # Run the callback asynchronously on the event loop
-            asyncio.run_coroutine_threadsafe(self.on_modified_callback(), self.loop)
+        if event.dest_path in self.watched_paths:
+            self.on_modified(event)
+
+    def schedule(self):
+        """
+        Restart the debounce timer of the callback. Must be called from the event loop thread.
+        """
+        if self.pending is not None:
+            self.pending.cancel()
+        self.pending = self.loop.call_later(DEBOUNCE_DELAY, self.run_callback)
+
+    def run_callback(self):
+        """
+        Run the callback on the event loop, keeping a reference to its task.
+
+        Only one callback runs at a time: if the previous one is still running,
+        the debounce timer is restarted once it is done.
+        """
+        self.pending = None
+        if self.task is not None and not self.task.done():
+            self.task.add_done_callback(lambda task: self.schedule())
+            return
+        logger.info("New JSON configurations detected.")
+        self.task = self.loop.create_task(self.on_modified_callback())